@@ -1,75 +1,195 @@
 import streamlit as st
 import pandas as pd
-import io
 import shutil
 import os
+import time
+
+# Waktu mulai rerun (untuk laporan latency per interaksi)
+run_start = time.perf_counter()
 
 # Tambahkan fungsi clean
 def clean_pycache():
     if os.path.exists("__pycache__"):
         shutil.rmtree("__pycache__")
 
-def clean_temp_folder():
-    if os.path.exists("temp"):
-        shutil.rmtree("temp")
-
-# Bersihkan cache
-clean_pycache()
-clean_temp_folder()
+# Bersihkan cache (hanya proses app, bukan pool worker yang mengimpor script ini, lihat main())
+if __name__ == '__main__':
+    clean_pycache()
 
 # Import custom style
 from style import load_custom_style
 
 # Import utils
-from utils.model_utils import load_model, classify_sentiment
-from utils.plot_utils import (
-    generate_wordcloud, save_wordcloud_image,
-    get_top_ngrams, plot_top_ngrams_bar_chart,
-    save_summary_chart
+from utils.plot_utils import show_wordcloud, plot_top_ngrams_bar_chart
+from utils.pdf_utils import build_report_images, create_summary_pdf
+from utils.render_utils import (
+    WORDCLOUD_PREVIEW_SIZE, render_wordcloud_frequencies_png, token_frequencies, wordcloud_image_name
+)
+from utils.pipeline_utils import (
+    DEFAULT_WORKERS, RESULT_SCHEMA_VERSION, analyze_file_job, compact_string_columns, dedup_summary, get_process_pool,
+    memory_footprint
+)
+from utils.job_utils import CANCELLED, FAILED, job_manager
+from utils.model_utils import LOW_CONFIDENCE_THRESHOLD, sentiment_group_index
+from utils.stats_utils import SentimentStats
+from utils.io_utils import EXPORT_FORMATS, MissingContentColumnError, export_dataframe
+from utils.cache_utils import artifact_cache, content_digest, make_cache_key, result_cache
+from utils.ngram_utils import top_ngrams_by_sentiment
+from utils.preprocessing_utils import INTERMEDIATE_COLUMNS, intermediate_columns
+from utils.resource_utils import get_missing_nltk_resources, get_model, get_slang_dict, resource_load_stats
+from utils.metrics_utils import (
+    METRICS_FILE, cache_snapshot, metrics_enabled, process_rss_bytes, record_time, timer_snapshot,
+    write_prometheus_file
 )
-from utils.pdf_utils import create_summary_pdf
-from utils.preprocessing_utils import load_slang_dict, preprocess_dataframe
 from streamlit_option_menu import option_menu
 
-# CUSTOM STYLE
-st.markdown(load_custom_style(), unsafe_allow_html=True)
-
-# MAIN TITLE
-st.markdown("<div class='title'>Sentiment Analysis of Love and Deepspace 💫</div>", unsafe_allow_html=True)
-
-# NOTE
-st.markdown("<p class='note-text'>📌 Please upload a CSV/Excel file with a content column</p>", unsafe_allow_html=True)
-
-# FILE UPLOADER
-uploaded_file = st.file_uploader("", type=['csv', 'xlsx'])
-
-# LOAD MODEL & VECTORIZER
-model, vectorizer = load_model()
-
-# LOAD SLANG DICTIONARY
-slang_dict = load_slang_dict()
-
-# MAIN PROGRAM
-if uploaded_file is not None:
-    try:
-        if uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
-        else:
-            df = pd.read_excel(uploaded_file)
-    except Exception as e:
-        st.error(f"⚠️ Failed to read the file: {e}")
-        st.stop()
+# File di atas batas ini diproses per chunk (streaming) supaya memori tetap terbatas
+STREAMING_MIN_BYTES = int(os.environ.get("LADS_STREAMING_MIN_MB", 20)) * 1024 * 1024
+
+# Interval polling progress job analisis (detik)
+JOB_POLL_SECONDS = float(os.environ.get("LADS_JOB_POLL_SECONDS", 0.5))
+
+# PROGRESS JOB ANALISIS: tampilkan progress per chunk, lalu rerun lagi sampai job selesai
+def wait_for_analysis(job):
+    st.progress(job.progress, text=job.message or "Waiting for a free worker...")
+    if st.button("✖️ Cancel analysis", disabled=job.cancel_requested):
+        job_manager.cancel(job.key)
+    time.sleep(JOB_POLL_SECONDS)
+    st.rerun()
+
+# POSISI BARIS per sentimen: dihitung sekali per dataset, dipakai semua menu & PDF
+def get_dataset_groups(df, dataset_key):
+    return artifact_cache.get_or_compute((dataset_key, "groups"), lambda: sentiment_group_index(df['Sentiment']))
+
+# STATISTIK SENTIMEN per dataset (jumlah, persentase, panjang teks, contoh), dipakai Summary & PDF
+def get_dataset_stats(df, dataset_key):
+    return artifact_cache.get_or_compute((dataset_key, "stats"), lambda: SentimentStats.from_dataframe(df))
+
+# TOP TRIGRAM per dataset: dihitung sekali (positif & negatif bersamaan), dipakai Summary & PDF
+def get_dataset_top_ngrams(df, dataset_key):
+    return artifact_cache.get_or_compute(
+        (dataset_key, "top_trigrams"),
+        lambda: top_ngrams_by_sentiment(df, ngram_range=(3, 3), n=10)
+    )
+
+# FREKUENSI TOKEN per dataset & sentimen (dari kolom preprocess), dipakai wordcloud UI & PDF
+def get_dataset_word_frequencies(df, dataset_key, groups, label):
+    return artifact_cache.get_or_compute(
+        (dataset_key, "word_frequencies", label),
+        lambda: token_frequencies(df['preprocess'].iloc[groups[label]].astype(str).tolist())
+    )
+
+# WORDCLOUD per dataset, sentimen & ukuran (PNG). Ukuran penuh dipakai ulang oleh report PDF (kunci yang sama)
+def get_dataset_wordcloud(df, dataset_key, groups, label, size=WORDCLOUD_PREVIEW_SIZE):
+    return artifact_cache.get_or_compute(
+        (dataset_key, wordcloud_image_name(label, size)),
+        lambda: render_wordcloud_frequencies_png(get_dataset_word_frequencies(df, dataset_key, groups, label), *size)
+    )
+
+# KOLOM TAHAP PREPROCESSING: tidak disimpan di hasil (hemat memori), dihitung ulang hanya saat diekspor
+def get_dataset_intermediate(df, dataset_key):
+    return artifact_cache.get_or_compute(
+        (dataset_key, "intermediate"),
+        lambda: compact_string_columns(pd.DataFrame(intermediate_columns(df['content'], get_slang_dict())))
+    )
+
+# MEMORI hasil analisis per dataset (total & per baris)
+def get_dataset_memory(df, dataset_key):
+    return artifact_cache.get_or_compute((dataset_key, "memory"), lambda: memory_footprint(df))
+
+# EXPORT per dataset, format & kolom: di-encode saat tombol download diklik, lalu di-cache
+def get_dataset_export(df, dataset_key, fmt, columns):
+    def export():
+        frame = df.copy(deep=False)
+        missing = [column for column in columns if column not in df.columns]
+        if missing:
+            intermediate = get_dataset_intermediate(df, dataset_key)
+            for column in missing:
+                frame[column] = intermediate[column].array
+        return export_dataframe(frame[list(columns)], fmt)
+
+    return artifact_cache.get_or_compute((dataset_key, "export", fmt, tuple(columns)), export)
+
+# Pool worker (forkserver/spawn) mengimpor script ini sebagai __mp_main__: di luar main() hanya ada import,
+# konstanta & definisi fungsi, jadi worker tidak menjalankan UI, memuat model atau menghapus __pycache__
+def main():
+    # CUSTOM STYLE
+    st.markdown(load_custom_style(), unsafe_allow_html=True)
+
+    # MAIN TITLE
+    st.markdown("<div class='title'>Sentiment Analysis of Love and Deepspace 💫</div>", unsafe_allow_html=True)
+
+    # NOTE
+    st.markdown("<p class='note-text'>📌 Please upload a CSV/Excel file with a content column</p>", unsafe_allow_html=True)
+
+    # FILE UPLOADER
+    uploaded_file = st.file_uploader("", type=['csv', 'xlsx'])
+
+    # LOAD MODEL & VECTORIZER (sekali per proses server, lihat resource_utils)
+    model, vectorizer = get_model()
+
+    # LOAD SLANG DICTIONARY
+    slang_dict = get_slang_dict()
+
+    missing_nltk = get_missing_nltk_resources()
+    if missing_nltk:
+        st.warning(f"⚠️ Missing NLTK resources: {', '.join(missing_nltk)}")
+
+    # MAIN PROGRAM
+    if uploaded_file is not None:
+        streaming = uploaded_file.size >= STREAMING_MIN_BYTES
+
+        # Hasil analisis di-cache per isi file + versi model & slang, jadi rerun (ganti menu) tidak menghitung ulang.
+        # Hash isi file dihitung sekali per upload (bukan di setiap polling progress), versi model & slang dicek tiap rerun
+        upload_digest = st.session_state.get("upload_digest")
+        # getvalue() (bukan getbuffer()): bytes upload dipakai bersama tanpa salinan, sama seperti data job
+        if upload_digest is None or upload_digest[0] != uploaded_file.file_id:
+            upload_digest = (uploaded_file.file_id, content_digest(uploaded_file.getvalue()))
+            st.session_state["upload_digest"] = upload_digest
+        dataset_key = make_cache_key(upload_digest[1], "streaming" if streaming else "full", RESULT_SCHEMA_VERSION)
+        df = result_cache.get(dataset_key)
+
+        # Analisis berjalan sebagai job di background (lihat job_utils): rerun, ganti menu atau session lain
+        # dengan file yang sama tidak memulai ulang analisis, cukup menunggu job yang sama
+        if df is None:
+            job = job_manager.submit(
+                dataset_key, analyze_file_job, uploaded_file.getvalue(), uploaded_file.name,
+                model, vectorizer, slang_dict, streaming=streaming
+            )
+            if not job.finished:
+                wait_for_analysis(job)
+
+            if job.status == CANCELLED:
+                st.warning("⏹️ Analysis cancelled.")
+                if st.button("🔄 Restart analysis"):
+                    job_manager.pop(dataset_key)
+                    st.rerun()
+                st.stop()
+
+            # Job gagal dihapus supaya upload/rerun berikutnya bisa mencoba lagi
+            if job.status == FAILED:
+                job_manager.pop(dataset_key)
+                if isinstance(job.error, MissingContentColumnError):
+                    st.error("❌ Column 'content' not found in the uploaded file.")
+                else:
+                    st.error(f"⚠️ Failed to analyze the file: {job.error}")
+                st.stop()
 
-    if 'content' not in df.columns:
-        st.error("❌ Column 'content' not found in the uploaded file.")
-    else:
-        with st.spinner("Analyzing sentiments, please wait..."):
-            df = preprocess_dataframe(df, slang_dict)
-            texts_to_classify = df['preprocess'].astype(str).tolist()
-            df['Sentiment'] = classify_sentiment(model, vectorizer, texts_to_classify)
+            df, stats = job.result
+            # Job selesai baru dihapus setelah hasilnya benar-benar tersimpan di result cache. Hasil yang melebihi
+            # LADS_RESULT_CACHE_MB tetap dipegang job (job_manager), jadi rerun berikutnya tidak menganalisis ulang
+            if result_cache.put(dataset_key, df):
+                job_manager.pop(dataset_key)
+            # Statistik sudah terkumpul per chunk, tidak perlu dihitung ulang dari df
+            artifact_cache.put((dataset_key, "stats"), stats)
 
         st.success("✅ Sentiment classification completed")
 
+        groups = get_dataset_groups(df, dataset_key)
+        positive_texts = df['content'].iloc[groups['positive']]
+        negative_texts = df['content'].iloc[groups['negative']]
+        stats = get_dataset_stats(df, dataset_key)
+
         # SIDEBAR MENU (Muncul setelah file di-upload)
         with st.sidebar:
             selected = option_menu(
@@ -89,26 +209,36 @@ if uploaded_file is not None:
         # MENU: Dataframe
         if selected == "Dataframe":
             st.subheader(f"Sentiment Classification Results (Total: {len(df)} rows)")
-            st.dataframe(df[['content', 'Sentiment', 'preprocess']])
+            low_confidence = df['LowConfidence'].to_numpy(dtype=bool)
+            st.caption(f"{int(low_confidence.sum())} reviews with confidence below {LOW_CONFIDENCE_THRESHOLD:.0%}")
+            # Dedup: teks yang sama (setelah case folding) hanya diproses sekali, sebagian diambil dari text store
+            if df.attrs.get('dedup'):
+                dedup = dedup_summary(df.attrs['dedup'])
+                saved = f" · ~{dedup['seconds_saved']:.1f}s saved" if dedup['seconds_saved'] is not None else ""
+                st.caption(
+                    f"🔁 {dedup['duplicate_ratio']:.0%} duplicate texts: {dedup['rows']} rows → {dedup['unique']} unique "
+                    f"({dedup['store_hits']} from the text store){saved}"
+                )
+            memory = get_dataset_memory(df, dataset_key)
+            st.caption(f"💾 {memory['bytes'] / (1024 * 1024):.2f} MB in memory ({memory['bytes_per_row']:.0f} bytes/row)")
+            view = df[low_confidence] if st.checkbox("Show only low-confidence reviews") else df
+            st.dataframe(view[['content', 'Sentiment', 'Confidence', 'preprocess']])
 
         # MENU: Wordcloud
         elif selected == "Wordcloud":
             st.subheader("Wordcloud")
-            
-            positive_texts = df[df['Sentiment'] == 'positive']['content']
-            negative_texts = df[df['Sentiment'] == 'negative']['content']
 
             col1, col2 = st.columns(2)
 
             with col1:
                 if not positive_texts.empty:
-                    generate_wordcloud(positive_texts, "Positive")
+                    show_wordcloud(get_dataset_wordcloud(df, dataset_key, groups, "positive"), "Positive")
                 else:
                     st.info("ℹ️ No Positive data found.")
 
             with col2:
                 if not negative_texts.empty:
-                    generate_wordcloud(negative_texts, "Negative")
+                    show_wordcloud(get_dataset_wordcloud(df, dataset_key, groups, "negative"), "Negative")
                 else:
                     st.info("ℹ️ No Negative data found.")
 
@@ -116,117 +246,129 @@ if uploaded_file is not None:
         elif selected == "Summary":
             st.subheader("Sentiment Summary")
 
-            count_positive = (df['Sentiment'] == 'positive').sum()
-            count_negative = (df['Sentiment'] == 'negative').sum()
-            total = count_positive + count_negative
-
-            percent_positive = round(100 * count_positive / total, 1) if total > 0 else 0
-            percent_negative = round(100 * count_negative / total, 1) if total > 0 else 0
-
             summary_df = pd.DataFrame({
                 'Sentiment': ['Positive', 'Negative'],
-                'Count': [count_positive, count_negative]
+                'Count': [stats.count('positive'), stats.count('negative')]
             })
             st.bar_chart(summary_df.set_index('Sentiment'))
 
-            if count_positive > count_negative:
-                summary_text = f"<span style='color:green; font-weight:bold;'>😊 This Data Contains More positives. ({percent_positive}% positive)</span>"
-            elif count_negative > count_positive:
-                summary_text = f"<span style='color:red; font-weight:bold;'>☹️ This Data Contains More negatives. ({percent_negative}% negative)</span>"
+            if stats.dominant() == 'positive':
+                summary_text = f"<span style='color:green; font-weight:bold;'>😊 This Data Contains More positives. ({stats.percent('positive')}% positive)</span>"
+            elif stats.dominant() == 'negative':
+                summary_text = f"<span style='color:red; font-weight:bold;'>☹️ This Data Contains More negatives. ({stats.percent('negative')}% negative)</span>"
             else:
                 summary_text = f"<span style='color:gray; font-weight:bold;'>⚖️ Equal number of positives and negatives.</span>"
             st.markdown(f"**Summary:** {summary_text}", unsafe_allow_html=True)
 
             st.markdown("#### Average Text Length per Sentiment")
-            df['TextLength'] = df['content'].astype(str).apply(lambda x: len(x.split()))
-            avg_length_positive = df[df['Sentiment'] == 'positive']['TextLength'].mean()
-            avg_length_negative = df[df['Sentiment'] == 'negative']['TextLength'].mean()
-
-            st.write(f"**Positive:** {avg_length_positive:.1f} words on average")
-            st.write(f"**Negative:** {avg_length_negative:.1f} words on average")
+            for label in ('positive', 'negative'):
+                st.write(
+                    f"**{label.capitalize()}:** {stats.average_length(label):.1f} words on average "
+                    f"(median {stats.length_quantile(label, 0.5)})"
+                )
 
             st.markdown("#### Example Positive Texts")
-            positive_examples = df[df['Sentiment'] == 'positive']['content'].head(3).tolist()
-            for i, text in enumerate(positive_examples, 1):
+            for i, text in enumerate(stats.examples['positive'], 1):
                 st.write(f"**{i}.** {text}")
 
             st.markdown("#### Example Negative Texts")
-            negative_examples = df[df['Sentiment'] == 'negative']['content'].head(3).tolist()
-            for i, text in enumerate(negative_examples, 1):
+            for i, text in enumerate(stats.examples['negative'], 1):
                 st.write(f"**{i}.** {text}")
 
-            ngram_range = (3, 3)
-            positive_texts = df[df['Sentiment'] == 'positive']['content']
+            top_ngrams = get_dataset_top_ngrams(df, dataset_key)
             if not positive_texts.empty:
                 st.markdown("#### Top Trigrams in Positive Sentiments")
-                top_positive_ngrams = get_top_ngrams(positive_texts, ngram_range=ngram_range)
-                plot_top_ngrams_bar_chart(top_positive_ngrams, "Top Trigrams - Positive")
+                plot_top_ngrams_bar_chart(top_ngrams['positive'], "Top Trigrams - Positive")
 
-            negative_texts = df[df['Sentiment'] == 'negative']['content']
             if not negative_texts.empty:
                 st.markdown("#### Top Trigrams in Negative Sentiments")
-                top_negative_ngrams = get_top_ngrams(negative_texts, ngram_range=ngram_range)
-                plot_top_ngrams_bar_chart(top_negative_ngrams, "Top Trigrams - Negative")
+                plot_top_ngrams_bar_chart(top_ngrams['negative'], "Top Trigrams - Negative")
 
         # MENU: Download
         elif selected == "Download":
             st.subheader("⬇️ Download Results")
 
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button("⬇️ Download as CSV", csv, "sentiment_results.csv", "text/csv")
+            # Kolom tahap preprocessing tidak ikut secara default (dihitung ulang jika dipilih)
+            available_columns = list(df.columns) + [column for column in INTERMEDIATE_COLUMNS if column not in df.columns]
+            selected_columns = st.multiselect(
+                "Columns to export", available_columns,
+                default=[column for column in df.columns if column not in INTERMEDIATE_COLUMNS]
+            )
+            # Urutan kolom tetap supaya pilihan yang sama memakai entri cache yang sama
+            export_columns = tuple(column for column in available_columns if column in selected_columns)
 
-            buffer = io.BytesIO()
-            df.to_excel(buffer, index=False)
-            buffer.seek(0)
-            st.download_button("⬇️ Download as Excel", buffer, "sentiment_results.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            if not export_columns:
+                st.info("Select at least one column to export.")
+            else:
+                # File baru dibuat saat tombol diklik (callable), bukan di setiap rerun
+                for fmt, (extension, mime) in EXPORT_FORMATS.items():
+                    st.download_button(
+                        f"⬇️ Download as {fmt}",
+                        lambda fmt=fmt: get_dataset_export(df, dataset_key, fmt, export_columns),
+                        f"sentiment_results.{extension}", mime, on_click="ignore"
+                    )
 
             if st.button("📄 Create Summary PDF"):
-                if not os.path.exists("temp"): os.makedirs("temp")
-                positive_texts = df[df['Sentiment'] == 'positive']['content']
-                negative_texts = df[df['Sentiment'] == 'negative']['content']
-
-                count_positive = (df['Sentiment'] == 'positive').sum()
-                count_negative = (df['Sentiment'] == 'negative').sum()
-                total = count_positive + count_negative
-                percent_positive = round(100 * count_positive / total, 1) if total > 0 else 0
-                percent_negative = round(100 * count_negative / total, 1) if total > 0 else 0
-
-                if not positive_texts.empty:
-                    save_wordcloud_image(positive_texts, "temp/wordcloud_positive.png")
-                if not negative_texts.empty:
-                    save_wordcloud_image(negative_texts, "temp/wordcloud_negative.png")
-                save_summary_chart(df, "temp/summary_chart.png")
-
-                create_summary_pdf(
-                    df,
-                    count_positive, count_negative,
-                    percent_positive, percent_negative,
-                    not positive_texts.empty, not negative_texts.empty
+                # Gambar dirender paralel (process pool jika multi-core), yang sudah ada di cache tidak dirender ulang
+                top_ngrams = get_dataset_top_ngrams(df, dataset_key)
+                images = build_report_images(
+                    df, stats, top_ngrams,
+                    executor=get_process_pool() if DEFAULT_WORKERS > 1 else None,
+                    cache=artifact_cache, dataset_key=dataset_key, groups=groups,
+                    word_frequencies={
+                        label: get_dataset_word_frequencies(df, dataset_key, groups, label) for label in groups
+                    }
                 )
 
+                pdf_bytes = create_summary_pdf(df, stats, top_ngrams=top_ngrams, images=images, groups=groups)
+
                 st.success("Summary created. Please click button below to download.")
-                with open("summary_report.pdf", "rb") as f:
-                    st.download_button("📄 Download Summary PDF", f, file_name="summary_report.pdf", mime="application/pdf")
+                st.download_button("📄 Download Summary PDF", pdf_bytes, file_name="summary_report.pdf", mime="application/pdf")
 
-                clean_temp_folder()
                 clean_pycache()
 
-# FOOTER / ABOUT APP
-st.markdown("---")
-st.markdown(
-    """
-    <div style='
-        text-align: center; 
-        color: white; 
-        font-size: 14px;
-        background-color: #725CAD; 
-        padding: 10px; 
-        border-radius: 8px;
-        '>
-        <b>About this App</b><br>
-        This sentiment analysis app was built using <b>Streamlit</b> and a <b>Naive Bayes</b> model with accuracy 87%<br>
-        Designed to analyze reviews of <i>Love and Deepspace</i> game.<br>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+    # FOOTER / ABOUT APP
+    st.markdown("---")
+    st.markdown(
+        """
+        <div style='
+            text-align: center; 
+            color: white; 
+            font-size: 14px;
+            background-color: #725CAD; 
+            padding: 10px; 
+            border-radius: 8px;
+            '>
+            <b>About this App</b><br>
+            This sentiment analysis app was built using <b>Streamlit</b> and a <b>Naive Bayes</b> model with accuracy 87%<br>
+            Designed to analyze reviews of <i>Love and Deepspace</i> game.<br>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    # LATENCY (cold start resource & durasi rerun ini)
+    load_stats = resource_load_stats()
+    run_seconds = time.perf_counter() - run_start
+    st.sidebar.caption(
+        f"⏱️ Cold start: {load_stats['cold_start']:.2f}s · "
+        f"This run: {run_seconds:.2f}s"
+    )
+
+    # DEBUG METRICS (LADS_METRICS=1): waktu per tahap, rasio hit cache, RSS proses
+    if metrics_enabled():
+        record_time("app_run", run_seconds)
+        with st.sidebar.expander("🛠️ Debug metrics"):
+            timers = pd.DataFrame.from_dict(timer_snapshot(), orient='index')
+            if not timers.empty:
+                timers['rows_per_s'] = (timers['rows'] / timers['seconds']).where(timers['rows'] > 0)
+                st.dataframe(timers.sort_values('seconds', ascending=False))
+            st.dataframe(pd.DataFrame.from_dict(cache_snapshot(), orient='index'))
+            rss = process_rss_bytes()
+            if rss is not None:
+                st.caption(f"RSS: {rss / (1024 * 1024):.1f} MB")
+        if METRICS_FILE:
+            write_prometheus_file()
+
+if __name__ == '__main__':
+    main()
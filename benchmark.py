@@ -0,0 +1,280 @@
+# Benchmark & profiling per tahap pipeline (preprocess, klasifikasi, statistik, n-gram, wordcloud, PDF)
+#
+#   python benchmark.py                                  # 1k & 10k baris
+#   python benchmark.py --sizes 1k,10k,100k,1M --output bench.json
+#   python benchmark.py --compare bench_before.json      # bandingkan dengan hasil commit lain
+#   python benchmark.py --sizes 10k --profile prof/      # dump cProfile per tahap (.prof + .txt)
+#   py-spy record -o profile.svg -- python benchmark.py --sizes 100k --no-memory
+#
+# Data ulasan sintetis (seed tetap): slang, huruf berulang, emoticon, emoji, keyword angka, kata tergabung.
+# Tahap per baris diukur per batch (--batch-size) -> throughput & latency p50/p95/p99 per batch.
+# Tahap per dataset diulang --repeat kali. Peak memori diukur terpisah dengan tracemalloc.
+import argparse
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.model_utils import classify_batch, sentiment_group_index
+from utils.ngram_utils import top_ngrams_by_sentiment
+from utils.pdf_utils import build_report_images, create_summary_pdf
+from utils.pipeline_utils import analyze_dataframe
+from utils.preprocessing_utils import (
+    EMOTICONS, clear_lemma_cache, keywords_with_numbers, preprocess_dataframe, preprocess_stages,
+    segment_word, set_segment_cache_size, segment_cache_info
+)
+from utils.render_utils import (
+    WORDCLOUD_PREVIEW_SIZE, WORDCLOUD_SIZE, render_wordcloud_frequencies_png, token_frequencies
+)
+from utils.resource_utils import get_model, get_slang_dict
+from utils.stats_utils import SentimentStats
+
+# --- Generator ulasan sintetis ---
+POSITIVE_WORDS = [
+    'love', 'amazing', 'beautiful', 'great', 'best', 'good', 'fun', 'awesome', 'recommend', 'enjoy',
+    'cute', 'romantic', 'handsome', 'worth', 'perfect', 'smooth', 'addictive', 'immersive', 'gorgeous', 'nice',
+]
+NEGATIVE_WORDS = [
+    'worst', 'boring', 'crash', 'bug', 'lag', 'expensive', 'greedy', 'trash', 'awful', 'broken',
+    'grindy', 'scam', 'unfair', 'disappointed', 'hate', 'laggy', 'terrible', 'annoying', 'slow', 'waste',
+]
+NEUTRAL_WORDS = [
+    'game', 'story', 'character', 'event', 'gacha', 'pull', 'rate', 'graphics', 'voice', 'card',
+    'update', 'battle', 'gameplay', 'music', 'phone', 'dev', 'diamond', 'banner', 'date', 'memory',
+    'the', 'is', 'and', 'but', 'so', 'this', 'it', 'i', 'my', 'really', 'very', 'too', 'not', 'can', 'with',
+    'Sylus', 'Rafayel', 'Xavier', 'Zayne', 'Caleb',
+]
+EMOJIS = ['💙', '🔥', '😭', '😍', '💀', '✨']
+PUNCTUATION = ['!!', '...', '?', ',', '.', '!!!']
+
+def token_pool(slang_dict, rng):
+    slang_words = sorted(word for word in slang_dict if ' ' not in word)
+    words = POSITIVE_WORDS + NEGATIVE_WORDS + NEUTRAL_WORDS
+    # Huruf terakhir diulang (gameee, sooo) & dua kata digabung (favouritecharacter)
+    elongated = [word + word[-1] * int(rng.integers(2, 5)) for word in words]
+    joined = [a + b for a, b in zip(rng.permutation(words), rng.permutation(words))]
+    groups = [
+        (words, 0.55), ([word.upper() for word in words], 0.03), (elongated, 0.08), (joined, 0.05),
+        (slang_words, 0.15), (EMOTICONS, 0.03), (EMOJIS, 0.03), (sorted(keywords_with_numbers), 0.03),
+        (PUNCTUATION, 0.05),
+    ]
+    pool = [token for tokens, _ in groups for token in tokens]
+    weights = np.concatenate([np.full(len(tokens), weight / len(tokens)) for tokens, weight in groups])
+    return pool, weights / weights.sum()
+
+def generate_reviews(n, slang_dict, seed=0, min_words=2, max_words=40):
+    rng = np.random.default_rng(seed)
+    pool, weights = token_pool(slang_dict, rng)
+    lengths = rng.integers(min_words, max_words + 1, size=n)
+    tokens = rng.choice(len(pool), size=int(lengths.sum()), p=weights)
+    reviews = []
+    start = 0
+    for length in lengths.tolist():
+        reviews.append(' '.join([pool[i] for i in tokens[start:start + length]]))
+        start += length
+    return pd.DataFrame({'content': reviews})
+
+def parse_size(text):
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+# --- Pengukuran ---
+def latency_summary(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        'p50': float(np.percentile(ms, 50)),
+        'p95': float(np.percentile(ms, 95)),
+        'p99': float(np.percentile(ms, 99)),
+        'max': float(ms.max()),
+    }
+
+def time_batches(func, data, batch_size):
+    times = []
+    for start in range(0, len(data), batch_size):
+        batch = data[start:start + batch_size]
+        begin = time.perf_counter()
+        func(batch)
+        times.append(time.perf_counter() - begin)
+    return times
+
+def time_repeats(func, repeat):
+    times = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - begin)
+    return times
+
+def peak_memory_mb(func):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+def profile_stage(func, path):
+    profiler = cProfile.Profile()
+    profiler.runcall(func)
+    profiler.dump_stats(f"{path}.prof")
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(30)
+    with open(f"{path}.txt", 'w', encoding='utf-8') as f:
+        f.write(text.getvalue())
+
+# Cache lemma & segmentasi dikosongkan per ukuran data, supaya hasil tidak bergantung urutan run
+def reset_caches():
+    clear_lemma_cache()
+    set_segment_cache_size(segment_cache_info()['maxsize'])
+
+# --- Daftar tahap: (nama, jenis, fungsi) ---
+# 'rows': fungsi(batch) dipanggil per batch; 'dataset': fungsi() dipanggil pada seluruh data
+def build_stages(df, model, vectorizer, slang_dict):
+    stages = []
+    frame = df.copy()
+    for column, source, func in preprocess_stages(slang_dict):
+        values = frame[source].tolist()
+        stages.append((f"preprocess.{column}", 'rows', values, lambda batch, func=func: [func(x) for x in batch]))
+        frame[column] = [func(x) for x in values]
+
+    stages.append(('preprocess_dataframe', 'rows', df,
+                   lambda batch: preprocess_dataframe(batch, slang_dict, keep_intermediate=False)))
+    preprocessed = frame['preprocess'].tolist()
+    stages.append(('classify', 'rows', preprocessed, lambda batch: classify_batch(model, vectorizer, batch)))
+
+    result = analyze_dataframe(df, model, vectorizer, slang_dict, keep_intermediate=False)
+    groups = sentiment_group_index(result['Sentiment'])
+    stats = SentimentStats.from_dataframe(result)
+    top_ngrams = top_ngrams_by_sentiment(result)
+    images = build_report_images(result, stats, top_ngrams, groups=groups)
+
+    def word_frequencies():
+        return [token_frequencies(result['preprocess'].iloc[rows].astype(str).tolist()) for rows in groups.values()]
+
+    frequencies = word_frequencies()
+
+    def wordclouds(size):
+        for counts in frequencies:
+            render_wordcloud_frequencies_png(counts, *size)
+
+    stages += [
+        ('stats', 'dataset', None, lambda: SentimentStats.from_dataframe(result)),
+        ('top_ngrams', 'dataset', None, lambda: top_ngrams_by_sentiment(result)),
+        ('word_frequencies', 'dataset', None, word_frequencies),
+        ('wordcloud', 'dataset', None, lambda: wordclouds(WORDCLOUD_SIZE)),
+        ('wordcloud_preview', 'dataset', None, lambda: wordclouds(WORDCLOUD_PREVIEW_SIZE)),
+        ('report_images', 'dataset', None, lambda: build_report_images(result, stats, top_ngrams, groups=groups)),
+        ('pdf', 'dataset', None, lambda: create_summary_pdf(result, stats, top_ngrams, images, groups)),
+    ]
+    return stages
+
+def run_size(n, args, model, vectorizer, slang_dict):
+    df = generate_reviews(n, slang_dict, seed=args.seed)
+    reset_caches()
+    results = {}
+    for name, kind, data, func in build_stages(df, model, vectorizer, slang_dict):
+        if kind == 'rows':
+            reset_caches()
+            times = time_batches(func, data, args.batch_size)
+            run_once = lambda func=func, data=data: func(data)
+        else:
+            times = time_repeats(func, args.repeat)
+            run_once = func
+        total = sum(times) if kind == 'rows' else float(np.median(times))
+        results[name] = {
+            'kind': kind,
+            'rows': n,
+            'seconds': total,
+            'rows_per_s': n / total if total > 0 else None,
+            'runs': len(times),
+            'latency_ms': latency_summary(times),
+        }
+        if not args.no_memory:
+            reset_caches()
+            results[name]['peak_mb'] = peak_memory_mb(run_once)
+        if args.profile:
+            os.makedirs(args.profile, exist_ok=True)
+            reset_caches()
+            profile_stage(run_once, os.path.join(args.profile, f"{n}_{name}"))
+        print_stage(n, name, results[name])
+    return results
+
+def print_stage(n, name, result):
+    latency = result['latency_ms']
+    memory = f"{result['peak_mb']:8.1f} MB" if 'peak_mb' in result else ''
+    print(
+        f"{n:>9} {name:<28} {result['seconds']:9.3f}s {result['rows_per_s'] or 0:12.0f} rows/s "
+        f"p50 {latency['p50']:9.2f} p95 {latency['p95']:9.2f} p99 {latency['p99']:9.2f} ms {memory}"
+    )
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Rasio waktu terhadap hasil sebelumnya (> 1 = lebih lambat)
+def compare(current, previous):
+    print("\nCompared with previous run (time ratio, >1.00 is slower):")
+    for size, stages in current['results'].items():
+        for name, result in stages.items():
+            before = previous.get('results', {}).get(size, {}).get(name)
+            if before and before['seconds']:
+                print(f"{size:>9} {name:<28} {result['seconds'] / before['seconds']:6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every stage of the sentiment pipeline")
+    parser.add_argument('--sizes', default='1k,10k', help="comma-separated row counts, e.g. 1k,10k,100k,1M")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write results as JSON")
+    parser.add_argument('--compare', help="previous JSON result to compare against")
+    parser.add_argument('--profile', help="directory for per-stage cProfile dumps")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc peak memory pass")
+    args = parser.parse_args()
+
+    model, vectorizer = get_model()
+    slang_dict = get_slang_dict()
+    # Set kata umum untuk segmentasi dibangun sekali di awal, tidak dihitung sebagai waktu tahap
+    segment_word('game')
+
+    report = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'batch_size': args.batch_size,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': {},
+    }
+    for size in args.sizes.split(','):
+        n = parse_size(size)
+        report['results'][str(n)] = run_size(n, args, model, vectorizer, slang_dict)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+if __name__ == '__main__':
+    main()
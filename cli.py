@@ -0,0 +1,245 @@
+# Scoring sentimen tanpa Streamlit untuk file besar (CSV, Excel, JSONL, Parquet)
+#
+#   python cli.py reviews.csv --output-dir out/                  # out/results.parquet + out/summary_report.pdf
+#   python cli.py dump.jsonl --output-dir out/ --results results.csv --workers 8
+#   python cli.py dump.parquet --output-dir out/ --keep-columns reviewId,score
+#
+# File dibaca per chunk dan diproses paralel di process pool. Tiap chunk selesai ditulis ke
+# out/parts/part-NNNNNN.parquet lalu out/checkpoint.json diperbarui, jadi run yang terputus
+# cukup dijalankan ulang dengan perintah yang sama untuk melanjutkan (--restart untuk mulai dari awal).
+import argparse
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+from collections import Counter
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.cache_utils import file_fingerprint
+from utils.io_utils import iter_content_chunks
+from utils.model_utils import MODEL_PATH, SENTIMENT_LABELS, sentiment_group_index
+from utils.ngram_utils import NgramCounter
+from utils.pdf_utils import build_report_images, create_summary_pdf
+from utils.pipeline_utils import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_WORKERS, dedup_summary, iter_analyzed_chunks, merge_dedup_stats, shutdown_process_pools
+)
+from utils.preprocessing_utils import SLANG_PATH
+from utils.render_utils import token_frequencies
+from utils.resource_utils import get_model, get_slang_dict
+from utils.stats_utils import SentimentStats
+
+CHECKPOINT_FILE = 'checkpoint.json'
+PARTS_DIR = 'parts'
+RESULT_FORMATS = ('.parquet', '.csv', '.jsonl')
+
+# --- Ringkasan untuk PDF, dikumpulkan per chunk (tanpa menyimpan seluruh data di memori) ---
+class ReportAccumulator:
+    def __init__(self):
+        self.stats = SentimentStats()
+        self.ngrams = NgramCounter(ngram_range=(3, 3))
+        self.word_frequencies = {label: Counter() for label in SENTIMENT_LABELS}
+
+    def update(self, chunk):
+        self.stats.update(chunk)
+        self.ngrams.update(chunk['content'].astype(str).tolist(), chunk['Sentiment'].astype(str).tolist())
+        preprocessed = chunk['preprocess'].astype(str)
+        for label, rows in sentiment_group_index(chunk['Sentiment']).items():
+            if len(rows):
+                self.word_frequencies[label].update(token_frequencies(preprocessed.iloc[rows].tolist()))
+
+# --- Checkpoint: input, parameter & versi model/slang harus sama untuk bisa dilanjutkan ---
+def run_signature(args):
+    stat = os.stat(args.input)
+    return {
+        'input': os.path.abspath(args.input),
+        'input_size': stat.st_size,
+        'input_mtime_ns': stat.st_mtime_ns,
+        'chunk_size': args.chunk_size,
+        'keep_columns': args.keep_columns,
+        'keep_intermediate': args.keep_intermediate,
+        'model': file_fingerprint(MODEL_PATH),
+        'slang': file_fingerprint(SLANG_PATH),
+    }
+
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(output_dir):
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def part_path(output_dir, index):
+    return os.path.join(output_dir, PARTS_DIR, f"part-{index:06d}.parquet")
+
+def write_part(output_dir, index, chunk):
+    path = part_path(output_dir, index)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    chunk.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+# Kolom --keep-columns memakai dtype hasil baca per chunk (mis. int64, lalu float64 di chunk dengan sel kosong),
+# jadi tipe tiap kolom disatukan untuk semua part. Yang tidak bisa disatukan (angka & teks) ditulis sebagai string
+def unify_part_schemas(schemas):
+    fields = []
+    for i, field in enumerate(schemas[0]):
+        try:
+            unified = pa.unify_schemas([pa.schema([schema.field(i)]) for schema in schemas], promote_options='permissive')
+            fields.append(unified.field(0))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            fields.append(pa.field(field.name, pa.large_string()))
+    return pa.schema(fields, metadata=schemas[0].metadata)
+
+# --- Gabungkan part menjadi satu file hasil (dibaca satu part per kali) ---
+def write_results(output_dir, n_parts, path):
+    paths = [part_path(output_dir, index) for index in range(n_parts)]
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if path.endswith('.parquet'):
+        if not paths:
+            raise ValueError("No rows to write")
+        # Schema part dibaca dari metadata saja, lalu tiap part di-cast ke schema gabungan
+        schema = unify_part_schemas([pq.read_schema(part) for part in paths])
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for part in paths:
+                writer.write_table(pq.read_table(part).cast(schema))
+    else:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            for i, part in enumerate(paths):
+                df = pd.read_parquet(part)
+                if path.endswith('.csv'):
+                    df.to_csv(f, index=False, header=(i == 0))
+                else:
+                    df.to_json(f, orient='records', lines=True, force_ascii=False)
+    os.replace(tmp_path, path)
+
+def print_progress(rows, start, done_chunks, stats):
+    elapsed = time.perf_counter() - start
+    print(
+        f"\rchunks {done_chunks} · rows {rows} · {rows / elapsed if elapsed else 0:.0f} rows/s · "
+        f"positive {stats.count('positive')} · negative {stats.count('negative')}",
+        end='', file=sys.stderr, flush=True
+    )
+
+def run(args):
+    os.makedirs(os.path.join(args.output_dir, PARTS_DIR), exist_ok=True)
+    signature = run_signature(args)
+    checkpoint = load_checkpoint(args.output_dir)
+    if args.restart:
+        shutil.rmtree(os.path.join(args.output_dir, PARTS_DIR))
+        os.makedirs(os.path.join(args.output_dir, PARTS_DIR))
+        checkpoint = None
+    if checkpoint and checkpoint['signature'] != signature:
+        raise SystemExit(
+            f"{args.output_dir} holds a checkpoint for a different input, settings or model; "
+            "use --restart to discard it"
+        )
+
+    done = checkpoint['completed_chunks'] if checkpoint else 0
+    rows = checkpoint['rows'] if checkpoint else 0
+    dedup = merge_dedup_stats([checkpoint.get('dedup')] if checkpoint else [])
+    report = ReportAccumulator()
+    # Lanjut dari checkpoint: ringkasan dibangun ulang dari part yang sudah ada (tanpa preprocessing ulang)
+    for index in range(done):
+        report.update(pd.read_parquet(part_path(args.output_dir, index)))
+    if done:
+        print(f"Resuming after {done} chunks ({rows} rows)", file=sys.stderr)
+
+    model, vectorizer = get_model()
+    slang_dict = get_slang_dict()
+    start = time.perf_counter()
+    new_rows = 0
+    if not (checkpoint and checkpoint.get('finished')):
+        with open(args.input, 'rb') as f:
+            chunks = iter_content_chunks(f, args.input, args.chunk_size, extra_columns=args.keep_columns)
+            # Chunk yang sudah selesai dilewati tanpa diproses
+            chunks = itertools.islice(chunks, done, None)
+            results = iter_analyzed_chunks(
+                chunks, model, vectorizer, slang_dict, args.workers, args.keep_intermediate, not args.no_store
+            )
+            for index, result in enumerate(results, start=done):
+                write_part(args.output_dir, index, result)
+                report.update(result)
+                dedup = merge_dedup_stats([dedup, result.attrs.get('dedup')])
+                done = index + 1
+                rows += len(result)
+                new_rows += len(result)
+                write_json_atomic(os.path.join(args.output_dir, CHECKPOINT_FILE), {
+                    'signature': signature, 'completed_chunks': done, 'rows': rows, 'finished': False,
+                    'dedup': dedup,
+                })
+                print_progress(new_rows, start, done, report.stats)
+        print(file=sys.stderr)
+        write_json_atomic(os.path.join(args.output_dir, CHECKPOINT_FILE), {
+            'signature': signature, 'completed_chunks': done, 'rows': rows, 'finished': True, 'dedup': dedup,
+        })
+
+    results_path = os.path.join(args.output_dir, args.results)
+    if done:
+        write_results(args.output_dir, done, results_path)
+        print(f"Results: {results_path} ({rows} rows)")
+
+    stats = report.stats
+    summary = {
+        'rows': stats.total,
+        'positive': stats.count('positive'),
+        'negative': stats.count('negative'),
+        'percent_positive': stats.percent('positive'),
+        'percent_negative': stats.percent('negative'),
+        'low_confidence': stats.low_confidence,
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+    if dedup['rows']:
+        dedup = dedup_summary(dedup)
+        summary['duplicate_ratio'] = round(dedup['duplicate_ratio'], 3)
+        summary['store_hits'] = dedup['store_hits']
+        if dedup['seconds_saved'] is not None:
+            summary['seconds_saved'] = round(dedup['seconds_saved'], 2)
+    write_json_atomic(os.path.join(args.output_dir, 'summary.json'), {**summary, 'stats': stats.to_dict()})
+
+    if not args.no_pdf and stats.total:
+        top_ngrams = report.ngrams.top_by_sentiment(n=10)
+        images = build_report_images(None, stats, top_ngrams, word_frequencies=report.word_frequencies)
+        pdf_path = os.path.join(args.output_dir, 'summary_report.pdf')
+        with open(pdf_path, 'wb') as f:
+            f.write(create_summary_pdf(None, stats, top_ngrams=top_ngrams, images=images))
+        print(f"Summary PDF: {pdf_path}")
+    print(json.dumps(summary))
+
+def main():
+    parser = argparse.ArgumentParser(description="Score review sentiment for large files without the web UI")
+    parser.add_argument('input', help="CSV, Excel (.xlsx), JSONL (.jsonl/.ndjson) or Parquet file with a content column")
+    parser.add_argument('--output-dir', required=True)
+    parser.add_argument('--results', default='results.parquet',
+                        help=f"result file name inside the output directory ({', '.join(RESULT_FORMATS)})")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--keep-columns', type=lambda value: [c for c in value.split(',') if c], default=[],
+                        help="comma-separated input columns copied to the results (e.g. reviewId,score)")
+    parser.add_argument('--keep-intermediate', action='store_true', help="also write the preprocessing stages")
+    parser.add_argument('--no-pdf', action='store_true')
+    parser.add_argument('--restart', action='store_true', help="discard an existing checkpoint")
+    parser.add_argument('--no-store', action='store_true', help="do not read or write the persistent text result store")
+    args = parser.parse_args()
+    if not args.results.endswith(RESULT_FORMATS):
+        parser.error(f"--results must end with one of {', '.join(RESULT_FORMATS)}")
+
+    try:
+        run(args)
+    except KeyboardInterrupt:
+        print("\nInterrupted; run the same command again to resume from the last checkpoint", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        shutdown_process_pools()
+
+if __name__ == '__main__':
+    main()
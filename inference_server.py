@@ -0,0 +1,216 @@
+# HTTP inference server untuk classify_batch (tanpa Streamlit, tanpa service luar)
+#
+#   python inference_server.py --port 8000
+#
+#   POST /predict        {"text": "...", "proba": true}
+#   POST /predict/batch  {"texts": ["...", "..."], "proba": false}
+#   GET  /health, GET /stats, GET /metrics (format teks Prometheus; timer tahap aktif jika LADS_METRICS=1)
+#
+# Request yang datang bersamaan dalam satu jendela waktu kecil digabung (micro-batch)
+# menjadi satu vectorizer.transform + model.predict.
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.metrics_utils import prometheus_text, timed
+from utils.model_utils import LOW_CONFIDENCE_THRESHOLD, classify_batch, confidence_from_proba
+from utils.preprocessing_utils import lemmatize_batch, normalize_text_tokens
+from utils.resource_utils import get_model, get_slang_dict
+
+# --- Micro-batcher: satu thread yang mengumpulkan request lalu memprosesnya sekaligus ---
+# Model & slang dictionary diambil per batch lewat get_model()/get_slang_dict() (cek mtime file),
+# jadi artifact baru dari install_artifact langsung dipakai tanpa restart server
+class MicroBatcher:
+    def __init__(self, max_batch_size=256, max_wait_ms=5):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = {'requests': 0, 'texts': 0, 'batches': 0}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, texts, with_proba=False):
+        future = Future()
+        self._queue.put((texts, with_proba, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = self._predict(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][2].set_exception(e)
+                else:
+                    self._predict_each(batch)
+                continue
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+
+    # Batch gabungan gagal: tiap request diproses ulang sendiri, supaya satu input bermasalah
+    # tidak ikut menggagalkan request lain yang kebetulan masuk batch yang sama
+    def _predict_each(self, batch):
+        for item in batch:
+            try:
+                result = self._predict([item])[0]
+            except Exception as e:
+                item[2].set_exception(e)
+            else:
+                item[2].set_result(result)
+
+    def _predict(self, batch):
+        texts = [text for item in batch for text in item[0]]
+        with_proba = any(item[1] for item in batch)
+        model, vectorizer = get_model()
+        slang_dict = get_slang_dict()
+
+        with timed("preprocess", rows=len(texts)):
+            token_lists = [normalize_text_tokens(text, slang_dict)[-1] for text in texts]
+            preprocessed = lemmatize_batch(token_lists)
+        with timed("classify", rows=len(texts)):
+            labels, proba = classify_batch(model, vectorizer, preprocessed, with_proba=with_proba)
+        labels = labels.tolist()
+        confidence = confidence_from_proba(proba) if with_proba else None
+
+        self.stats['requests'] += len(batch)
+        self.stats['texts'] += len(texts)
+        self.stats['batches'] += 1
+
+        results = []
+        start = 0
+        for item_texts, item_proba, _ in batch:
+            item_results = []
+            for i in range(start, start + len(item_texts)):
+                result = {'sentiment': labels[i], 'preprocess': preprocessed[i]}
+                if item_proba:
+                    result['proba_positive'] = float(proba[i])
+                    result['confidence'] = float(confidence[i])
+                    result['low_confidence'] = bool(confidence[i] < LOW_CONFIDENCE_THRESHOLD)
+                item_results.append(result)
+            results.append(item_results)
+            start += len(item_texts)
+        return results
+
+# --- HTTP handler ---
+class InferenceHandler(BaseHTTPRequestHandler):
+    batcher = None
+
+    def _send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        self._send_body(status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _send_predictions(self, texts, with_proba, single=False):
+        try:
+            results = self.batcher.submit(texts, with_proba).result()
+        except Exception:
+            self._send_json(500, {'error': 'prediction failed'})
+            return
+        self._send_json(200, results[0] if single else {'results': results})
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            stats = dict(self.batcher.stats)
+            stats['avg_batch_texts'] = stats['texts'] / stats['batches'] if stats['batches'] else 0.0
+            self._send_json(200, stats)
+        elif self.path == '/metrics':
+            self._send_body(200, prometheus_text().encode('utf-8'), 'text/plain; version=0.0.4')
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        try:
+            payload = self._read_json()
+        except ValueError:
+            self._send_json(400, {'error': 'invalid JSON body'})
+            return
+        if not isinstance(payload, dict):
+            self._send_json(400, {'error': 'JSON body must be an object'})
+            return
+        # Hanya boolean JSON: "false" atau 0 tidak diartikan sebagai true
+        with_proba = payload.get('proba', False)
+        if not isinstance(with_proba, bool):
+            self._send_json(400, {'error': "'proba' must be a boolean"})
+            return
+
+        if self.path == '/predict':
+            text = payload.get('text')
+            if not isinstance(text, str):
+                self._send_json(400, {'error': "'text' must be a string"})
+                return
+            self._send_predictions([text], with_proba, single=True)
+        elif self.path == '/predict/batch':
+            texts = payload.get('texts')
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                self._send_json(400, {'error': "'texts' must be a list of strings"})
+                return
+            if not texts:
+                self._send_json(200, {'results': []})
+                return
+            self._send_predictions(texts, with_proba)
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def log_message(self, format, *args):
+        pass
+
+class InferenceServer(ThreadingHTTPServer):
+    # Backlog default (5) terlalu kecil untuk banyak koneksi bersamaan
+    request_queue_size = 128
+    daemon_threads = True
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment inference server (micro-batched)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    # Muat resource sebelum menerima request pertama
+    get_model()
+    get_slang_dict()
+    InferenceHandler.batcher = MicroBatcher(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    server = InferenceServer((args.host, args.port), InferenceHandler)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Load test untuk inference_server.py: throughput & latency (p50/p95/p99)
+#
+#   python inference_server.py --port 8000
+#   python load_test.py --url http://127.0.0.1:8000 --requests 2000 --concurrency 32
+#   python load_test.py --batch-size 50      # pakai endpoint /predict/batch
+import argparse
+import json
+import random
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SAMPLE_REVIEWS = [
+    "I LOVE this gameee so muchhh <3 the story is amazing",
+    "Worst gacha evaaa, p2w af :( idk why i still play",
+    "good game",
+    "graphics are beautiful but the battles are boring tbh",
+    "the game keeps crashing on my phone, fix it devs!!!",
+    "f2p friendly and the 10pull rates are decent imo",
+    "Sylus is sooo hot 10/10 would recommend",
+    "too many bugs and the events are so grindy ugh",
+]
+
+def post_json(url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}, method='POST'
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def run_request(base_url, batch_size, proba):
+    start = time.perf_counter()
+    if batch_size > 1:
+        texts = random.choices(SAMPLE_REVIEWS, k=batch_size)
+        post_json(f"{base_url}/predict/batch", {'texts': texts, 'proba': proba})
+    else:
+        post_json(f"{base_url}/predict", {'text': random.choice(SAMPLE_REVIEWS), 'proba': proba})
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the sentiment inference server")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--proba', action='store_true')
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip('/')
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = list(executor.map(
+            lambda _: run_request(base_url, args.batch_size, args.proba), range(args.requests)
+        ))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    texts = args.requests * max(args.batch_size, 1)
+    print(f"Requests: {args.requests} (concurrency {args.concurrency}, batch size {max(args.batch_size, 1)})")
+    print(f"Elapsed: {elapsed:.2f}s")
+    print(f"Throughput: {args.requests / elapsed:.1f} req/s, {texts / elapsed:.1f} texts/s")
+    print(
+        f"Latency ms: p50 {np.percentile(latencies_ms, 50):.1f}, "
+        f"p95 {np.percentile(latencies_ms, 95):.1f}, "
+        f"p99 {np.percentile(latencies_ms, 99):.1f}, "
+        f"max {latencies_ms.max():.1f}"
+    )
+
+if __name__ == '__main__':
+    main()
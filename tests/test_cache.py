@@ -0,0 +1,70 @@
+# ResultCache: hit/miss, eviction memori (byte) & disk (byte, LRU lewat mtime)
+import os
+
+import pandas as pd
+import pytest
+
+# cache_utils mengimpor preprocessing_utils, yang memuat stopwords NLTK saat import
+try:
+    from utils.cache_utils import ResultCache, dataframe_nbytes
+except LookupError:
+    pytest.skip("NLTK resources not available", allow_module_level=True)
+
+def frame(n, text='review'):
+    return pd.DataFrame({'content': [f"{text} {i}" for i in range(n)], 'Confidence': [0.5] * n})
+
+def disk_files(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith('.parquet'))
+
+def test_memory_hit_and_miss():
+    cache = ResultCache(10 * 1024 * 1024)
+    assert cache.get('a') is None
+    df = frame(10)
+    assert cache.put('a', df)
+    pd.testing.assert_frame_equal(cache.get('a'), df)
+    assert cache.info()['hits'] == 1 and cache.info()['misses'] == 1
+
+def test_memory_evicts_least_recently_used():
+    df = frame(100)
+    cache = ResultCache(int(dataframe_nbytes(df) * 2.5))
+    cache.put('a', df)
+    cache.put('b', df)
+    cache.get('a')
+    cache.put('c', df)
+    # 'b' paling lama tidak dipakai
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.info()['nbytes'] <= cache.max_bytes
+
+def test_oversized_frame_without_disk_is_not_stored():
+    df = frame(100)
+    cache = ResultCache(dataframe_nbytes(df) - 1)
+    assert not cache.put('a', df)
+    assert cache.get('a') is None
+
+def test_disk_hit_after_memory_eviction(tmp_path):
+    df = frame(100)
+    cache = ResultCache(dataframe_nbytes(df) - 1, str(tmp_path))
+    assert cache.put('a', df)
+    pd.testing.assert_frame_equal(cache.get('a'), df)
+    assert cache.info()['disk_hits'] == 1
+
+def test_disk_evicts_least_recently_used(tmp_path):
+    df = frame(1000)
+    cache = ResultCache(0, str(tmp_path))
+    cache.put('a', df)
+    size = os.path.getsize(os.path.join(cache.cache_dir, 'a.parquet'))
+    cache.max_disk_bytes = int(size * 2.5)
+    cache.put('b', df)
+    # mtime eksplisit: 'a' dipakai (get) setelah 'b', jadi 'b' yang paling lama tidak dipakai
+    os.utime(os.path.join(cache.cache_dir, 'b.parquet'), ns=(1_000_000_000, 1_000_000_000))
+    os.utime(os.path.join(cache.cache_dir, 'a.parquet'), ns=(2_000_000_000, 2_000_000_000))
+    cache.put('c', df)
+    assert disk_files(cache) == ['a.parquet', 'c.parquet']
+    assert cache.info()['disk_evictions'] == 1
+    assert cache.get('b') is None
+
+    # File yang sendiri lebih besar dari batas disk tidak disimpan sama sekali
+    cache.max_disk_bytes = size // 2
+    assert not cache.put('d', df)
+    assert disk_files(cache) == []
@@ -0,0 +1,65 @@
+# Pembaca chunk: content (+ text_columns) selalu string, kolom lain (--keep-columns) tetap dengan dtype asli
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.io_utils import count_rows, iter_content_chunks
+
+SOURCE = pd.DataFrame({
+    'content': ['good game', None, 'NA', 'bad'],
+    'score': [5, 1, np.nan, 2],
+    'label': [1, 0, 1, None],
+})
+
+def to_bytes(df, filename):
+    buffer = io.BytesIO()
+    if filename.endswith('.csv'):
+        df.to_csv(buffer, index=False)
+    elif filename.endswith('.jsonl'):
+        df.to_json(buffer, orient='records', lines=True)
+    elif filename.endswith('.parquet'):
+        df.to_parquet(buffer, index=False)
+    else:
+        df.to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+def read_all(filename, df=SOURCE, chunk_size=2, **kwargs):
+    return pd.concat(iter_content_chunks(to_bytes(df, filename), filename, chunk_size, **kwargs))
+
+@pytest.mark.parametrize('filename', ['in.csv', 'in.jsonl', 'in.parquet', 'in.xlsx'])
+def test_keep_columns_keep_dtype(filename):
+    df = read_all(filename, extra_columns=['score'])
+    assert df['content'].tolist()[:2] == ['good game', '']
+    assert pd.api.types.is_numeric_dtype(df['score'])
+    assert df['score'].tolist()[:2] == [5, 1]
+    assert df['score'].isna().tolist() == [False, False, True, False]
+    assert df.index.tolist() == [0, 1, 2, 3]
+
+@pytest.mark.parametrize('filename', ['in.csv', 'in.jsonl', 'in.parquet', 'in.xlsx'])
+def test_text_columns_are_strings(filename):
+    df = read_all(filename, extra_columns=['label'], text_columns=['label'])
+    assert df['label'].map(type).eq(str).all()
+    assert df['label'].iloc[3] == ''
+
+def test_csv_content_keeps_na_text():
+    df = read_all('in.csv', extra_columns=['score'])
+    assert df['content'].iloc[2] == 'NA'
+
+@pytest.mark.parametrize('filename', ['in.jsonl', 'in.xlsx'])
+def test_mixed_column_becomes_text(filename):
+    mixed = SOURCE.assign(reviewId=pd.Series([1, 'abc', 3, None], dtype=object))
+    # Dalam satu chunk; beda tipe antar chunk disatukan saat cli.py menggabungkan part
+    df = read_all(filename, df=mixed, chunk_size=4, extra_columns=['reviewId'])
+    assert df['reviewId'].tolist()[:3] == ['1', 'abc', '3']
+    assert df['reviewId'].isna().iloc[3]
+
+@pytest.mark.parametrize('filename, expected', [('in.csv', None), ('in.jsonl', None), ('in.parquet', 4), ('in.xlsx', 4)])
+def test_count_rows(filename, expected):
+    file = to_bytes(SOURCE, filename)
+    file.seek(3)
+    assert count_rows(file, filename) == expected
+    # Posisi baca tidak berubah
+    assert file.tell() == 3
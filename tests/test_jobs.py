@@ -0,0 +1,98 @@
+# JobManager: progress, pembatalan lewat job.report(), error diteruskan ke job.error
+import threading
+import time
+
+import pytest
+
+from utils.job_utils import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobManager
+
+def wait_finished(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, f"job {job.key} still {job.status}"
+        time.sleep(0.01)
+    return job
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1)
+    yield manager
+    manager._executor.shutdown(wait=True, cancel_futures=True)
+
+def test_progress_and_result(manager):
+    step, proceed = threading.Event(), threading.Event()
+
+    def work(job, n):
+        job.report(0.5, 'half')
+        step.set()
+        proceed.wait(5)
+        return n * 2
+
+    job = manager.submit('a', work, 21)
+    assert step.wait(5)
+    assert job.status == RUNNING and job.progress == 0.5 and job.message == 'half'
+    proceed.set()
+    wait_finished(job)
+    assert job.status == DONE and job.result == 42 and job.progress == 1.0
+    assert job.error is None and job.finished_at >= job.started_at
+
+def test_same_key_reuses_job(manager):
+    calls = []
+    job = manager.submit('a', lambda job: calls.append(1))
+    assert manager.submit('a', lambda job: calls.append(2)) is job
+    wait_finished(job)
+    assert calls == [1]
+    # Setelah di-pop, kunci yang sama memulai job baru
+    assert manager.pop('a') is job
+    wait_finished(manager.submit('a', lambda job: calls.append(3)))
+    assert calls == [1, 3]
+
+def test_cancel_running_job(manager):
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        while True:
+            job.report(message='working')
+            time.sleep(0.01)
+
+    job = manager.submit('a', work)
+    assert started.wait(5)
+    assert manager.cancel('a') is job
+    wait_finished(job)
+    assert job.status == CANCELLED and job.result is None
+    assert manager.cancel('missing') is None
+
+def test_cancel_queued_job_never_runs(manager):
+    proceed = threading.Event()
+    blocker = manager.submit('blocker', lambda job: proceed.wait(5))
+    ran = []
+    job = manager.submit('queued', lambda job: ran.append(1))
+    assert job.status == QUEUED
+    job.cancel()
+    proceed.set()
+    wait_finished(blocker)
+    wait_finished(job)
+    assert job.status == CANCELLED and ran == []
+
+def test_error_propagates(manager):
+    def work(job):
+        job.report(0.3)
+        raise ValueError('bad input')
+
+    job = wait_finished(manager.submit('a', work))
+    assert job.status == FAILED
+    assert isinstance(job.error, ValueError) and str(job.error) == 'bad input'
+    assert job.progress == pytest.approx(0.3)
+    assert manager.info()[FAILED] == 1
+
+def test_history_keeps_latest_finished_jobs():
+    manager = JobManager(max_workers=1, history=2)
+    try:
+        for key in 'abcd':
+            wait_finished(manager.submit(key, lambda job: None))
+        wait_finished(manager.submit('e', lambda job: None))
+        # Job selesai lebih dari 'history' dibuang saat submit, yang paling lama dulu
+        assert [key for key in 'abcde' if manager.get(key)] == ['c', 'd', 'e']
+    finally:
+        manager._executor.shutdown(wait=True)
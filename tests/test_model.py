@@ -0,0 +1,40 @@
+# classify_batch (per chunk, label categorical) harus sama dengan model.predict / predict_proba sekaligus
+import os
+
+import numpy as np
+import pytest
+
+from utils.model_utils import MODEL_PATH, SENTIMENT_DTYPE, classify_batch, classify_sentiment, load_model
+
+TEXTS = [
+    "good game", "love the story so much", "bad update crashes every time", "worst gacha rates",
+    "romance is great", "", "lag lag lag", "love love love", "boring event", "great card art",
+] * 7
+
+@pytest.fixture(scope='module')
+def model_and_vectorizer():
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip(f"{MODEL_PATH} not available")
+    return load_model()
+
+def expected(model, vectorizer, texts):
+    tfidf = vectorizer.transform(texts)
+    labels = np.where(model.predict(tfidf) == 1, 'positive', 'negative')
+    proba = model.predict_proba(tfidf)[:, list(model.classes_).index(1)]
+    return labels, proba
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 16, 1000])
+def test_classify_batch_matches_predict(model_and_vectorizer, chunk_size):
+    model, vectorizer = model_and_vectorizer
+    labels, proba = classify_batch(model, vectorizer, TEXTS, chunk_size=chunk_size)
+    expected_labels, expected_proba = expected(model, vectorizer, TEXTS)
+    assert labels.dtype == SENTIMENT_DTYPE
+    assert np.asarray(labels).tolist() == expected_labels.tolist()
+    np.testing.assert_allclose(proba, expected_proba)
+
+def test_classify_batch_without_proba(model_and_vectorizer):
+    model, vectorizer = model_and_vectorizer
+    labels, proba = classify_batch(model, vectorizer, iter(TEXTS), with_proba=False, chunk_size=4)
+    assert proba is None
+    assert classify_sentiment(model, vectorizer, TEXTS) == labels.tolist()
+    assert len(classify_batch(model, vectorizer, [])[0]) == 0
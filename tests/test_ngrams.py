@@ -0,0 +1,50 @@
+# Top n-gram: versi sparse (semua label sekaligus) & inkremental harus sama dengan sort dense per label
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+
+from utils.ngram_utils import NgramCounter, select_top_k, top_ngrams_by_label, top_ngrams_by_sentiment
+
+WORDS = ['game', 'love', 'story', 'gacha', 'rates', 'bad', 'update', 'crash', 'event', 'card', 'romance', 'lag']
+
+def random_texts(n, seed=0):
+    rng = np.random.default_rng(seed)
+    texts = [' '.join(rng.choice(WORDS, size=rng.integers(0, 9))) for _ in range(n)]
+    labels = rng.choice(['positive', 'negative'], size=n).tolist()
+    return texts, labels
+
+# Acuan: implementasi lama (fit per label, X.toarray(), sort seluruh vocabulary)
+def dense_top_ngrams(texts, ngram_range, n):
+    vectorizer = CountVectorizer(stop_words='english', ngram_range=ngram_range)
+    X = vectorizer.fit_transform(texts)
+    counts = X.toarray().sum(axis=0)
+    ngrams_freq = dict(zip(vectorizer.get_feature_names_out(), counts))
+    return sorted(ngrams_freq.items(), key=lambda x: x[1], reverse=True)[:n]
+
+@pytest.mark.parametrize('ngram_range, n', [((1, 1), 5), ((2, 2), 10), ((3, 3), 10), ((1, 3), 25)])
+def test_top_ngrams_by_label_matches_dense_sort(ngram_range, n):
+    texts, labels = random_texts(300)
+    result = top_ngrams_by_label(texts, labels, ngram_range, n)
+    for label in ('positive', 'negative'):
+        label_texts = [text for text, text_label in zip(texts, labels) if text_label == label]
+        expected = [(term, int(count)) for term, count in dense_top_ngrams(label_texts, ngram_range, n)]
+        assert result[label] == expected
+
+def test_ngram_counter_matches_top_ngrams_by_label():
+    texts, labels = random_texts(300, seed=1)
+    counter = NgramCounter(ngram_range=(2, 3))
+    for start in range(0, len(texts), 64):
+        counter.update(texts[start:start + 64], labels[start:start + 64])
+    assert counter.top(10) == top_ngrams_by_label(texts, labels, (2, 3), 10)
+
+def test_select_top_k_orders_ties_by_index():
+    indices, values = select_top_k(np.array([0, 3, 1, 3, 0, 2, 3]), 3)
+    assert indices.tolist() == [1, 3, 6] and values.tolist() == [3, 3, 3]
+    indices, values = select_top_k(np.array([0, 1, 0]), 5)
+    assert indices.tolist() == [1] and values.tolist() == [1]
+
+def test_empty_or_stopword_only_texts():
+    assert top_ngrams_by_label(['', 'the and of'], ['positive', 'negative'], (1, 1)) == {'positive': [], 'negative': []}
+    df = pd.DataFrame({'content': ['love love story'], 'Sentiment': ['positive']})
+    assert top_ngrams_by_sentiment(df, (1, 1)) == {'positive': [('love', 2), ('story', 1)], 'negative': []}
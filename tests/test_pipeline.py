@@ -0,0 +1,88 @@
+# Dedup (hasil teks unik disebar ke semua baris) & text store (SQLite): hasil harus sama dengan memproses tiap baris
+import pandas as pd
+import pytest
+
+# preprocessing_utils memuat stopwords NLTK saat import (download jika belum ada)
+try:
+    from utils import pipeline_utils
+    from utils.preprocessing_utils import missing_nltk_resources
+except LookupError:
+    pytest.skip("NLTK resources not available", allow_module_level=True)
+if missing_nltk_resources():
+    pytest.skip("NLTK resources not available", allow_module_level=True)
+
+from utils.cache_utils import TextResultStore
+from utils.resource_utils import get_model, get_slang_dict
+
+TEXTS = [
+    "Good game!!", "good game", "Rafayel is sooo romantic <3", "bad update, crashes every time",
+    "GOOD GAME", "", "bad update, crashes every time", "love the 10pull rates f2p friendly", "good game",
+]
+
+@pytest.fixture(scope='module')
+def resources():
+    model, vectorizer = get_model()
+    return model, vectorizer, get_slang_dict()
+
+def analyze(df, resources, **kwargs):
+    return pipeline_utils.analyze_dataframe(df, *resources, **kwargs)
+
+def row_by_row(texts, resources):
+    # Acuan: setiap baris dianalisis sendiri, tanpa ada duplikat yang bisa dilewati
+    return pd.concat(
+        [analyze(pd.DataFrame({'content': [text]}), resources) for text in texts], ignore_index=True
+    )
+
+def test_dedup_broadcasts_results(resources):
+    df = pd.DataFrame({'content': TEXTS, 'score': range(len(TEXTS))})
+    result = analyze(df, resources)
+    expected = row_by_row(TEXTS, resources)
+    columns = [column for column in expected.columns if column != 'content']
+    pd.testing.assert_frame_equal(result[columns], expected[columns])
+    assert result['score'].tolist() == list(range(len(TEXTS)))
+    dedup = result.attrs['dedup']
+    assert dedup['rows'] == len(TEXTS)
+    # "Good game!!", "good game" & "GOOD GAME" sama setelah case folding & pembersihan
+    assert dedup['unique'] == dedup['processed'] == 5
+
+def test_sharded_matches_analyze_dataframe(resources):
+    df = pd.DataFrame({'content': TEXTS * 3})
+    expected = analyze(df, resources)
+    result = pipeline_utils.analyze_dataframe_sharded(df, *resources, n_workers=1, chunk_size=2)
+    pd.testing.assert_frame_equal(result, expected)
+    # Dedup global, bukan per chunk
+    assert result.attrs['dedup']['unique'] == 5
+
+# Tanpa kolom tahap: teks yang ada di store tidak diproses maupun diklasifikasi ulang
+def test_text_store_hits_and_misses(resources, tmp_path, monkeypatch):
+    store = TextResultStore(str(tmp_path / 'text_results.sqlite'))
+    monkeypatch.setattr(pipeline_utils, 'text_store', store)
+    df = pd.DataFrame({'content': TEXTS})
+    expected = analyze(df, resources, keep_intermediate=False)
+
+    first = analyze(df, resources, keep_intermediate=False, use_store=True)
+    assert first.attrs['dedup']['store_hits'] == 0
+    assert first.attrs['dedup']['processed'] == 5
+    assert store.stats == {'hits': 0, 'misses': 5}
+
+    second = analyze(df, resources, keep_intermediate=False, use_store=True)
+    assert second.attrs['dedup']['store_hits'] == 5
+    assert second.attrs['dedup']['processed'] == 0
+    assert store.stats == {'hits': 5, 'misses': 5}
+    pd.testing.assert_frame_equal(second, expected)
+
+    # Versi lain (model/slang/preprocessing berubah) tidak pernah memakai hasil lama
+    assert store.get_many(['good game'], 'other-version') == {}
+    assert len(store.get_many(['good game'], TextResultStore.version())) == 1
+
+def test_text_store_partial_hits(resources, tmp_path, monkeypatch):
+    store = TextResultStore(str(tmp_path / 'text_results.sqlite'))
+    monkeypatch.setattr(pipeline_utils, 'text_store', store)
+    analyze(pd.DataFrame({'content': TEXTS[:3]}), resources, keep_intermediate=False, use_store=True)
+
+    df = pd.DataFrame({'content': TEXTS})
+    result = analyze(df, resources, keep_intermediate=False, use_store=True)
+    # "good game" & "rafayel ..." dari store, tiga teks unik lain diproses
+    assert result.attrs['dedup']['store_hits'] == 2
+    assert result.attrs['dedup']['processed'] == 3
+    pd.testing.assert_frame_equal(result, analyze(df, resources, keep_intermediate=False))
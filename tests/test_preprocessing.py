@@ -0,0 +1,254 @@
+# Paritas pipeline preprocessing dengan salinan beku pipeline asli (tujuh .apply() per tahap).
+# Fungsi legacy_* di bawah disalin apa adanya dari versi awal utils/preprocessing_utils.py dan tidak boleh diubah:
+# setiap optimasi preprocessing harus menghasilkan kolom yang persis sama.
+# Satu perbedaan yang disengaja: entri slang & stopword multi kata ('on fleek', 'you re', 'loo b tupi') kini ikut
+# cocok (lihat matcher_utils). Acuannya reference_replace_phrases, versi naif yang tidak memakai kode aplikasi.
+import random
+import re
+import string
+
+import nltk
+import pandas as pd
+import pytest
+import wordninja
+from nltk.corpus import stopwords, wordnet
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import word_tokenize
+
+from utils.metrics_utils import metrics_enabled, set_metrics_enabled
+
+# preprocessing_utils memuat stopwords NLTK saat import (download jika belum ada)
+try:
+    from utils import preprocessing_utils
+except LookupError:
+    pytest.skip("NLTK resources not available", allow_module_level=True)
+if preprocessing_utils.missing_nltk_resources():
+    pytest.skip("NLTK resources not available", allow_module_level=True)
+
+# --- Pipeline asli (beku) ---
+legacy_stop_words = set(stopwords.words('english'))
+legacy_stop_words.update({
+    'im', 'ive', 'youve', 'theyve', 'hes', 'shes', 'its', 'theres', 'whats', 'thats', 'were', 'youre', 'you re', 'they re',
+    'make', 'made', 'makes', 'argghhh', 'arghhh', 'ugh', 'omg', 'omgg', 'yayyy', 'loo b tupi',
+    'hmmm', 'ummm', 'uhhh', 'emmm', 'yaaa', 'ehhh', 'awww', 'huh',
+    'grrr', 'yaaaay', 'booo', 'aaah', 'meh', 'eh', 'owww', 'whoa', 'woah',
+    'dawg', 'just', 'really', 'actually', 'literally', 'basically',
+    'kinda', 'sorta'
+})
+legacy_keywords_with_numbers = {'f2p', 'p2w', '5star', '4star', '10pull', '10x', '2d', '3d'}
+legacy_lemmatizer = WordNetLemmatizer()
+
+def legacy_clean_data_ulasan(text):
+    text = re.sub(r'(<3|:\)|:-\)|:\(|:-\(|:D|XD|xD)', '', text, flags=re.IGNORECASE)  # hapus emoji teks
+    text = re.sub(r'[^\w\s]', '', text)        # hapus tanda baca
+    text = re.sub(r'[^\x00-\x7F]+', '', text)  # hapus karakter non-ASCII
+    text = re.sub(r'\s+', ' ', text).strip()   # rapikan spasi
+    return text
+
+def legacy_case_folding(text):
+    return text.lower()
+
+def legacy_remove_slang(text, slang_dict):
+    words = text.split()
+    normalized_words = [slang_dict.get(word, word) for word in words]
+    return ' '.join(normalized_words)
+
+def legacy_reduce_elongated_words(word):
+    return re.sub(r'(.)\1{2,}', r'\1\1', word)
+
+def legacy_prep_text(text):
+    if pd.isnull(text):
+        return ""
+
+    raw_words = text.split()
+    cleaned_words = []
+
+    for word in raw_words:
+        if word in legacy_keywords_with_numbers:
+            cleaned_words.append(word)
+        else:
+            word_clean = ''.join(char for char in word if char not in string.punctuation and not char.isdigit())
+            word_clean = legacy_reduce_elongated_words(word_clean)
+            cleaned_words.append(word_clean)
+
+    final_words = []
+    for word in cleaned_words:
+        if word in legacy_keywords_with_numbers:
+            final_words.append(word)
+        else:
+            split_words = wordninja.split(word)
+            final_words.extend(split_words)
+
+    return ' '.join(final_words).strip()
+
+def legacy_remove_stopwords(text):
+    if pd.isnull(text):
+        return ""
+    return ' '.join([word for word in text.split() if word not in legacy_stop_words])
+
+def legacy_tokenize_text(text):
+    return word_tokenize(text)
+
+def legacy_get_wordnet_pos(word):
+    tag = nltk.pos_tag([word])[0][1][0].upper()
+    tag_dict = {"J": wordnet.ADJ, "N": wordnet.NOUN, "V": wordnet.VERB, "R": wordnet.ADV}
+    return tag_dict.get(tag, wordnet.NOUN)
+
+def legacy_lemmatize(tokens):
+    lemmatized_text = [legacy_lemmatizer.lemmatize(word, legacy_get_wordnet_pos(word)) for word in tokens]
+    return ' '.join(lemmatized_text)
+
+def legacy_preprocess_dataframe(df, slang_dict):
+    df = df.copy()
+    df['clean_content'] = df['content'].apply(legacy_clean_data_ulasan)
+    df['case_folding'] = df['clean_content'].apply(legacy_case_folding)
+    df['slang_removed'] = df['case_folding'].apply(lambda x: legacy_remove_slang(x, slang_dict))
+    df['normalized'] = df['slang_removed'].apply(legacy_prep_text)
+    df['stopword'] = df['normalized'].apply(legacy_remove_stopwords)
+    df['tokenized'] = df['stopword'].apply(legacy_tokenize_text)
+    df['preprocess'] = df['tokenized'].apply(legacy_lemmatize)
+    return df
+
+# --- Acuan entri multi kata ---
+# Dari kiri ke kanan: coba frasa terpanjang dulu di tiap posisi; pengganti None = frasa dihapus
+def reference_replace_phrases(text, mapping):
+    mapping = {' '.join(phrase.split()): replacement for phrase, replacement in mapping.items()}
+    max_words = max(len(phrase.split()) for phrase in mapping)
+    words = text.split()
+    output = []
+    i = 0
+    while i < len(words):
+        for n in range(min(max_words, len(words) - i), 0, -1):
+            phrase = ' '.join(words[i:i + n])
+            if phrase in mapping:
+                if mapping[phrase] is not None:
+                    output.append(mapping[phrase])
+                i += n
+                break
+        else:
+            output.append(words[i])
+            i += 1
+    return ' '.join(output)
+
+def reference_preprocess_dataframe(df, slang_dict):
+    stopword_mapping = {word: None for word in legacy_stop_words}
+    df = df.copy()
+    df['clean_content'] = df['content'].apply(legacy_clean_data_ulasan)
+    df['case_folding'] = df['clean_content'].apply(legacy_case_folding)
+    df['slang_removed'] = df['case_folding'].apply(lambda x: reference_replace_phrases(x, slang_dict))
+    df['normalized'] = df['slang_removed'].apply(legacy_prep_text)
+    df['stopword'] = df['normalized'].apply(lambda x: reference_replace_phrases(x, stopword_mapping))
+    df['tokenized'] = df['stopword'].apply(legacy_tokenize_text)
+    df['preprocess'] = df['tokenized'].apply(legacy_lemmatize)
+    return df
+
+# --- Data uji ---
+EDGE_CASES = [
+    "", "   ", "\t\n", "<3", ":) :-) :( :-( :D XD xD", "I LOVE this gameee so muchhh <3 btw f2p friendly!!",
+    "Worst gacha evaaa, p2w :( idk why", "Good game!!", "good game", "youre amazing xD the 10pull rates are awful",
+    "they re making it pay to win ugh", "you re so kind", "it's okay i guess, loo b tupi", "meh. just ok tbh",
+    "Rafayel!!! 💙💙 best boy", "Sylus is sooo hot 🔥🔥 10/10 would recommend", "café naïve über straße",
+    "omg omg the 5star drop rate is trash", "gr8 gameplay, imo worth it", "2d 3d 10x 4star 5star",
+    "F2P P2W 10PULL", "i've spent 100 dollars already lmao", "favouritecharacter loveanddeepspace bestgameever",
+    "aaaaaa zzzzzz !!!!! ?????", "snake_case_words and under_scores", "mixed123numbers 4you b4 gr8",
+    "running jumped happily beautiful dangerous cats", "the the the a an and", "x", "x y z",
+]
+
+WORDS = [
+    'game', 'love', 'hate', 'story', 'gacha', 'event', 'banner', 'pull', 'rates', 'graphics', 'boring', 'beautiful',
+    'running', 'crashed', 'happily', 'wonderful', 'dangerous', 'characters', 'sooo', 'goooood', 'muchhh', 'ugh',
+    'meh', 'omg', 'just', 'really', 'you', 're', 'they', 'loo', 'b', 'tupi', 'f2p', 'p2w', '5star', '10pull',
+    '2d', '3d', 'fav0urite', 'amazing!!', "don't", 'can\'t', 'co-op', 'e-mail', '100%', '#1', '@devs', 'loveit',
+    'bestboy', 'paytowin', 'wonderfulgame', '💙', '🔥', 'é', '<3', ':)', 'xD', ':D', 'THE', 'Game', 'LOVE',
+]
+
+def generated_texts(slang_dict, n=500, seed=1234):
+    rng = random.Random(seed)
+    vocabulary = WORDS + sorted(slang_dict)[:200]
+    separators = [' ', ' ', ' ', '  ', ', ', '. ', '! ', '\t', '\n']
+    texts = []
+    for _ in range(n):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 25))]
+        texts.append(''.join(word + rng.choice(separators) for word in words))
+    return texts
+
+@pytest.fixture(scope='module')
+def slang_dict():
+    return preprocessing_utils.load_slang_dict()
+
+@pytest.fixture(scope='module')
+def reviews(slang_dict):
+    return pd.DataFrame({'content': EDGE_CASES + generated_texts(slang_dict)})
+
+@pytest.fixture(scope='module')
+def expected(reviews, slang_dict):
+    return reference_preprocess_dataframe(reviews, slang_dict)
+
+def assert_columns_equal(result, expected, columns):
+    for column in columns:
+        assert list(result[column]) == list(expected[column]), column
+
+# --- Paritas ---
+ALL_COLUMNS = preprocessing_utils.INTERMEDIATE_COLUMNS + ['preprocess']
+
+def test_preprocess_dataframe_matches_legacy(reviews, slang_dict, expected):
+    result = preprocessing_utils.preprocess_dataframe(reviews, slang_dict)
+    assert list(result.columns) == list(expected.columns)
+    assert_columns_equal(result, expected, ALL_COLUMNS)
+
+def test_preprocess_without_intermediate_columns(reviews, slang_dict, expected):
+    result = preprocessing_utils.preprocess_dataframe(reviews, slang_dict, keep_intermediate=False)
+    assert list(result.columns) == ['content', 'preprocess']
+    assert_columns_equal(result, expected, ['preprocess'])
+
+def test_preprocess_without_batch_lemmatize(reviews, slang_dict, expected):
+    preprocessing_utils.clear_lemma_cache()
+    result = preprocessing_utils.preprocess_dataframe(reviews, slang_dict, batch_lemmatize=False)
+    assert_columns_equal(result, expected, ALL_COLUMNS)
+
+def test_preprocess_with_metrics_matches_legacy(reviews, slang_dict, expected):
+    enabled = metrics_enabled()
+    set_metrics_enabled(True)
+    try:
+        result = preprocessing_utils.preprocess_dataframe(reviews, slang_dict)
+    finally:
+        set_metrics_enabled(enabled)
+    assert_columns_equal(result, expected, ALL_COLUMNS)
+
+def test_intermediate_columns_match_legacy(reviews, slang_dict, expected):
+    columns = preprocessing_utils.intermediate_columns(reviews['content'], slang_dict)
+    assert list(columns) == preprocessing_utils.INTERMEDIATE_COLUMNS
+    assert_columns_equal(columns, expected, preprocessing_utils.INTERMEDIATE_COLUMNS)
+
+def test_small_lemma_cache_matches_legacy(reviews, slang_dict, expected):
+    size = preprocessing_utils.lemma_cache_info()['maxsize']
+    preprocessing_utils.set_lemma_cache_size(5)
+    try:
+        result = preprocessing_utils.preprocess_dataframe(reviews, slang_dict, keep_intermediate=False)
+    finally:
+        preprocessing_utils.set_lemma_cache_size(size)
+    assert_columns_equal(result, expected, ['preprocess'])
+
+def test_phrase_entries_match(slang_dict):
+    texts = pd.DataFrame({'content': ["on fleek", "it's okay, loo b tupi", "you re so kind", "good game"]})
+    result = preprocessing_utils.preprocess_dataframe(texts, {**slang_dict, 'on fleek': 'perfect'})
+    assert list(result['slang_removed'])[0] == 'perfect'
+    assert list(result['stopword'])[1:] == ['okay', 'kind', 'good game']
+
+# Tanpa entri multi kata, hasilnya sama persis dengan pipeline asli
+def test_single_word_entries_match_legacy(reviews, slang_dict):
+    single_word_slang = {word: value for word, value in slang_dict.items() if ' ' not in word}
+    phrases = {word for word in legacy_stop_words if ' ' in word} | set(slang_dict) - set(single_word_slang)
+    legacy = legacy_preprocess_dataframe(reviews, single_word_slang)
+    rows = [
+        i for i, (folded, normalized) in enumerate(zip(legacy['case_folding'], legacy['normalized']))
+        if not any(f' {phrase} ' in f' {folded} ' or f' {phrase} ' in f' {normalized} ' for phrase in phrases)
+    ]
+    assert len(rows) > len(reviews) // 2
+    result = preprocessing_utils.preprocess_dataframe(reviews.iloc[rows], single_word_slang)
+    assert_columns_equal(result, legacy.iloc[rows], ALL_COLUMNS)
+
+@pytest.mark.parametrize('stage', range(7))
+def test_stage_functions_match_legacy(reviews, slang_dict, expected, stage):
+    column, source, func = preprocessing_utils.preprocess_stages(slang_dict)[stage]
+    assert [func(value) for value in expected[source]] == list(expected[column])
@@ -0,0 +1,94 @@
+# Regression corpus segmentasi kata: data/segmentation_corpus.tsv berisi kata & hasil wordninja.split (dibekukan).
+# segment_word (known-word set + LRU) harus selalu sama dengan wordninja, juga setelah model diganti & dikembalikan.
+import os
+
+import pytest
+import wordninja
+
+# preprocessing_utils memuat stopwords NLTK saat import (download jika belum ada)
+try:
+    from utils import preprocessing_utils
+except LookupError:
+    pytest.skip("NLTK resources not available", allow_module_level=True)
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'segmentation_corpus.tsv')
+
+def load_corpus():
+    corpus = []
+    with open(CORPUS_PATH, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line and not line.startswith('#'):
+                word, expected = line.split('\t')
+                corpus.append((word, expected.split()))
+    return corpus
+
+CORPUS = load_corpus()
+
+@pytest.fixture(autouse=True)
+def default_segmentation():
+    keywords = set(preprocessing_utils.keywords_with_numbers)
+    size = preprocessing_utils.segment_cache_info()['maxsize']
+    preprocessing_utils.set_segmentation_model()
+    yield
+    preprocessing_utils.set_segmentation_model()
+    preprocessing_utils.set_segment_cache_size(size)
+    preprocessing_utils.keywords_with_numbers.clear()
+    preprocessing_utils.keywords_with_numbers.update(keywords)
+
+def segment_all(words):
+    return [list(preprocessing_utils.segment_word(word)) for word in words]
+
+def test_corpus_matches_wordninja():
+    # Gagal jika versi/model wordninja berubah: perbarui corpus dengan sengaja, bukan diam-diam
+    words = [word for word, _ in CORPUS]
+    assert [wordninja.split(word) for word in words] == [expected for _, expected in CORPUS]
+
+def test_segment_word_matches_corpus():
+    words = [word for word, _ in CORPUS]
+    expected = [expected for _, expected in CORPUS]
+    assert segment_all(words) == expected
+    # Panggilan kedua dari known-word set / LRU cache
+    assert segment_all(words) == expected
+    info = preprocessing_utils.segment_cache_info()
+    assert info['known_words'] > 0 and info['hits'] > 0
+
+def test_segment_word_with_tiny_cache():
+    preprocessing_utils.set_segment_cache_size(2)
+    words = [word for word, _ in CORPUS]
+    assert segment_all(words) == [expected for _, expected in CORPUS]
+
+def test_set_segmentation_model_uses_new_model():
+    words = [word for word, _ in CORPUS]
+    segment_all(words)
+
+    model = preprocessing_utils.DomainLanguageModel(['gacha', 'rafayel', 'sylus', 'xavier', 'zayne', 'f2p'])
+    preprocessing_utils.set_segmentation_model(model, domain_keywords=['F2P', '10pull'])
+    # Cache & known-word set dari model lama tidak dipakai lagi
+    assert segment_all(words) == [model.split(word) for word in words]
+    assert list(preprocessing_utils.segment_word('gachagame')) == ['gacha', 'game']
+    assert {'f2p', '10pull'} <= preprocessing_utils.keywords_with_numbers
+    assert preprocessing_utils.segmentation_version() != 'default'
+
+    preprocessing_utils.set_segmentation_model()
+    assert segment_all(words) == [expected for _, expected in CORPUS]
+    # Keyword domain ikut dilepas saat kembali ke model bawaan
+    assert preprocessing_utils.keywords_with_numbers == preprocessing_utils.DEFAULT_KEYWORDS_WITH_NUMBERS
+    assert preprocessing_utils.segmentation_version() == 'default'
+
+def test_cache_versions_follow_segmentation_model():
+    from utils.cache_utils import TextResultStore, make_cache_key
+
+    digest = b'upload'
+    default_key, default_store = make_cache_key(digest, 'full'), TextResultStore.version()
+    model = preprocessing_utils.DomainLanguageModel(['gacha', 'rafayel'])
+    preprocessing_utils.set_segmentation_model(model)
+    custom_key, custom_store = make_cache_key(digest, 'full'), TextResultStore.version()
+    assert custom_key != default_key and custom_store != default_store
+    # Keyword lain = versi lain
+    preprocessing_utils.set_segmentation_model(model, domain_keywords=['10pull', 'f2p', 'ssr'])
+    assert make_cache_key(digest, 'full') != custom_key
+
+    preprocessing_utils.set_segmentation_model()
+    assert make_cache_key(digest, 'full') == default_key
+    assert TextResultStore.version() == default_store
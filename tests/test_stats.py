@@ -0,0 +1,59 @@
+# SentimentStats: akumulasi per chunk harus sama dengan menghitung sekali dari seluruh data
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.stats_utils import SentimentStats, word_counts
+
+RNG = np.random.default_rng(0)
+N = 500
+
+def results_frame(n=N):
+    lengths = RNG.integers(0, 40, size=n)
+    return pd.DataFrame({
+        'content': [' '.join(['kata'] * k) for k in lengths],
+        'Sentiment': RNG.choice(['negative', 'positive'], size=n),
+        'LowConfidence': RNG.random(n) < 0.2,
+    })
+
+def test_update_in_chunks_matches_from_dataframe():
+    df = results_frame()
+    expected = SentimentStats.from_dataframe(df)
+    stats = SentimentStats()
+    for start in range(0, len(df), 37):
+        stats.update(df.iloc[start:start + 37])
+    stats.update(df.iloc[:0])
+    assert stats.to_dict() == expected.to_dict()
+    assert stats.total == len(df)
+    assert stats.low_confidence == int(df['LowConfidence'].sum())
+
+def test_counts_percent_and_examples():
+    df = pd.DataFrame({
+        'content': ['good game', 'bad', 'love it', 'great', 'meh'],
+        'Sentiment': ['positive', 'negative', 'positive', 'positive', None],
+    })
+    stats = SentimentStats.from_dataframe(df, n_examples=2)
+    # Baris tanpa label tidak dihitung
+    assert stats.total == 4
+    assert stats.count('positive') == 3 and stats.percent('positive') == 75.0
+    assert stats.examples['positive'] == ['good game', 'love it']
+    assert stats.average_length('positive') == pytest.approx(5 / 3)
+    assert stats.dominant() == 'positive'
+
+def test_text_length_column_is_used():
+    df = pd.DataFrame({'content': ['a b c'], 'Sentiment': ['negative'], 'TextLength': [7]})
+    assert SentimentStats.from_dataframe(df).length_sum['negative'] == 7
+
+@pytest.mark.parametrize('q', [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0])
+def test_length_quantile_matches_numpy(q):
+    df = results_frame()
+    stats = SentimentStats.from_dataframe(df)
+    for label in ['negative', 'positive']:
+        lengths = word_counts(df.loc[df['Sentiment'] == label, 'content'])
+        assert stats.length_quantile(label, q) == np.quantile(lengths, q, method='inverted_cdf')
+
+def test_empty_label():
+    stats = SentimentStats.from_dataframe(pd.DataFrame({'content': ['x'], 'Sentiment': ['positive']}))
+    assert np.isnan(stats.length_quantile('negative', 0.5))
+    assert np.isnan(stats.average_length('negative'))
+    assert stats.percent('negative') == 0
@@ -0,0 +1,50 @@
+# Training ulang model sentimen dari ulasan berlabel (CSV/Excel dengan kolom content + label)
+#
+#   python train.py reviews_labeled.csv
+#   python train.py reviews.csv --label-column score --score-threshold 4    # label dari rating
+#   python train.py reviews.csv --compact --min-df 2 --max-features 50000   # artifact kecil, float32
+#   python train.py reviews.csv --vectorizer hashing --compact              # tanpa vocabulary
+#   python train.py reviews.csv --install                                   # timpa mnb_model.pkl
+#
+# Artifact ditulis ke models/mnb_model-<versi>.pkl (+ .json metadata & metrik holdout).
+import argparse
+import json
+
+from utils.train_utils import (
+    HASHING_FEATURES, LABEL_COLUMN, MODEL_DIR, PREPROCESS_CACHE_DIR, install_artifact, train
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the MultinomialNB sentiment model out-of-core")
+    parser.add_argument('path', help="CSV/Excel file with a content column and a label column")
+    parser.add_argument('--label-column', default=LABEL_COLUMN)
+    parser.add_argument('--score-threshold', type=float, default=None,
+                        help="derive labels from a numeric rating column (>= threshold is positive)")
+    parser.add_argument('--vectorizer', choices=['tfidf', 'hashing'], default='tfidf')
+    parser.add_argument('--compact', action='store_true', help="store float32 weights")
+    parser.add_argument('--min-df', type=int, default=1)
+    parser.add_argument('--max-features', type=int, default=None)
+    parser.add_argument('--n-features', type=int, default=HASHING_FEATURES)
+    parser.add_argument('--alpha', type=float, default=1.0)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=20000)
+    parser.add_argument('--cache-dir', default=PREPROCESS_CACHE_DIR, help="preprocessing cache ('' to disable)")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--install', action='store_true', help="copy the new artifact over the active model")
+    args = parser.parse_args()
+
+    path, metadata = train(
+        args.path, label_column=args.label_column, vectorizer_kind=args.vectorizer, compact=args.compact,
+        min_df=args.min_df, max_features=args.max_features, n_features=args.n_features, alpha=args.alpha,
+        test_size=args.test_size, seed=args.seed, chunk_size=args.chunk_size,
+        score_threshold=args.score_threshold, cache_dir=args.cache_dir or None, model_dir=args.model_dir
+    )
+    print(json.dumps(metadata['metrics'], indent=2))
+    print(f"Saved {path} ({metadata['artifact_bytes'] / 1024:.0f} KB, loads in {metadata['load_seconds']:.3f}s)")
+    if args.install:
+        install_artifact(path)
+        print("Installed as the active model")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+from utils.metrics_utils import register_cache
+from utils.model_utils import MODEL_PATH
+from utils.preprocessing_utils import SLANG_PATH, preprocessing_version
+
+# Batas memori cache hasil & folder cache disk (opsional, format Parquet) beserta batas ukurannya
+RESULT_CACHE_MAX_MB = int(os.environ.get('LADS_RESULT_CACHE_MB', 512))
+RESULT_CACHE_DIR = os.environ.get('LADS_RESULT_CACHE_DIR')
+RESULT_CACHE_DISK_MAX_MB = int(os.environ.get('LADS_RESULT_CACHE_DISK_MB', 4096))
+# Batas cache artefak turunan (gambar, export, kolom tahap): jumlah entri & memori
+ARTIFACT_CACHE_MAX_ENTRIES = int(os.environ.get('LADS_ARTIFACT_CACHE_ENTRIES', 256))
+ARTIFACT_CACHE_MAX_MB = int(os.environ.get('LADS_ARTIFACT_CACHE_MB', 256))
+# Folder cache per user (bukan folder kerja tempat app/cli/server dijalankan): LADS_CACHE_DIR, atau
+# $XDG_CACHE_HOME/lads (default ~/.cache/lads)
+USER_CACHE_DIR = os.environ.get('LADS_CACHE_DIR') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'lads'
+)
+# Store hasil per teks (SQLite) yang bertahan antar upload & restart; string kosong = nonaktif
+TEXT_STORE_PATH = os.environ.get('LADS_TEXT_STORE', os.path.join(USER_CACHE_DIR, 'text_results.sqlite'))
+
+# --- Fingerprint file (model, slang) untuk versi cache ---
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _fingerprints_lock:
+        cached = _fingerprints.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    with _fingerprints_lock:
+        _fingerprints[path] = (signature, digest)
+    return digest
+
+def content_digest(data):
+    return hashlib.sha256(data).digest()
+
+# digest: content_digest(isi file), dihitung sekali per upload oleh pemanggil
+def make_cache_key(digest, *options):
+    key = hashlib.sha256()
+    key.update(digest)
+    key.update(file_fingerprint(MODEL_PATH).encode())
+    key.update(file_fingerprint(SLANG_PATH).encode())
+    key.update(preprocessing_version().encode())
+    for option in options:
+        key.update(str(option).encode())
+    return key.hexdigest()
+
+def dataframe_nbytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+# Perkiraan memori artefak: bytes/PNG, DataFrame, array, dict & list (rekursif), objek lain lewat atributnya
+def artifact_nbytes(value):
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, pd.DataFrame):
+        return dataframe_nbytes(value)
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(artifact_nbytes(k) + artifact_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(artifact_nbytes(item) for item in value)
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + artifact_nbytes(vars(value))
+    return sys.getsizeof(value)
+
+# --- Cache hasil analisis: memori (LRU, dibatasi ukuran) + disk (Parquet, LRU lewat mtime, dibatasi ukuran) ---
+class ResultCache:
+    def __init__(self, max_bytes, cache_dir=None, max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'disk_evictions': 0}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def _store(self, key, df, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = (df, nbytes)
+        self._nbytes += nbytes
+        while self._nbytes > self.max_bytes:
+            _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+            self._nbytes -= evicted_nbytes
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                # Shallow copy: kolom baru di sisi pemanggil tidak mengubah isi cache
+                return entry[0].copy(deep=False)
+
+        if self.cache_dir and os.path.exists(self._disk_path(key)):
+            try:
+                # mtime = waktu terakhir dipakai, acuan eviction disk
+                os.utime(self._disk_path(key))
+                df = pd.read_parquet(self._disk_path(key))
+            except FileNotFoundError:
+                # Dihapus proses lain (eviction) di antara exists() & baca
+                df = None
+            if df is not None:
+                if 'tokenized' in df.columns:
+                    df['tokenized'] = df['tokenized'].map(list)
+                with self._lock:
+                    self.stats['disk_hits'] += 1
+                    self._store(key, df, dataframe_nbytes(df))
+                return df.copy(deep=False)
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    # Hasil: True jika get(key) berikutnya bisa mengembalikan df (di memori atau di disk);
+    # False jika df lebih besar dari max_bytes dan tidak tersimpan di disk (tanpa cache disk, atau file sendiri
+    # sudah melebihi max_disk_bytes)
+    def put(self, key, df):
+        nbytes = dataframe_nbytes(df)
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            self._store(key, df, nbytes)
+        if self.cache_dir:
+            # Tulis ke file sementara dulu supaya pembaca lain tidak melihat file setengah jadi
+            tmp_path = f"{self._disk_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, self._disk_path(key))
+            if self.max_disk_bytes is not None:
+                self._trim_disk(keep=self._disk_path(key))
+            if os.path.exists(self._disk_path(key)):
+                return True
+        return nbytes <= self.max_bytes
+
+    # File yang paling lama tidak dipakai (mtime) dihapus sampai total ukuran <= max_disk_bytes.
+    # keep (file yang baru ditulis) dihapus terakhir, hanya jika sendirian sudah melebihi batas
+    def _trim_disk(self, keep=None):
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.parquet'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((path == keep, stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, _, size, _ in files)
+        for _, _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.stats['disk_evictions'] += 1
+
+    def info(self):
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['disk_hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'nbytes': self._nbytes,
+                'max_bytes': self.max_bytes,
+                'max_disk_bytes': self.max_disk_bytes or 0,
+                'hit_ratio': (self.stats['hits'] + self.stats['disk_hits']) / lookups if lookups else 0.0,
+            }
+
+# --- Cache artefak turunan per dataset (n-gram, gambar, export), kunci (dataset_key, nama) ---
+# LRU dibatasi jumlah entri & ukuran (artifact_nbytes). Artefak yang lebih besar dari max_bytes
+# (mis. export dataset besar) tetap dikembalikan get_or_compute, hanya tidak disimpan.
+class ArtifactCache:
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._entries[key][0]
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key, value):
+        nbytes = artifact_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            while len(self._entries) > self.max_entries or self._nbytes > self.max_bytes:
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_nbytes
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._entries[key][0]
+            self.stats['misses'] += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def info(self):
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'nbytes': self._nbytes,
+                'max_bytes': self.max_bytes,
+                'hit_ratio': self.stats['hits'] / lookups if lookups else 0.0,
+            }
+
+# --- Store hasil per teks: hash teks (setelah case folding) -> (preprocess, kode sentimen, confidence) ---
+# Kunci di-hash bersama versi model, slang & preprocessing (termasuk model segmentasi), jadi hasil dari versi lama
+# tidak pernah terpakai; saat versi berganti isi tabel dikosongkan supaya file tidak terus membesar.
+# Satu koneksi per proses & thread (aman untuk worker process pipeline).
+class TextResultStore:
+    BATCH_SIZE = 500
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key BLOB PRIMARY KEY, preprocess TEXT, sentiment INTEGER, confidence REAL) WITHOUT ROWID"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def version():
+        return f"{file_fingerprint(MODEL_PATH)}:{file_fingerprint(SLANG_PATH)}:{preprocessing_version()}"
+
+    @staticmethod
+    def keys(texts, version):
+        salt = hashlib.sha256(version.encode()).digest()
+        return [hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16, key=salt).digest()
+                for text in texts]
+
+    # Hasil: {posisi: (preprocess, kode sentimen, confidence)} untuk teks yang sudah ada di store
+    def get_many(self, texts, version):
+        keys = self.keys(texts, version)
+        positions = {key: i for i, key in enumerate(keys)}
+        found = {}
+        conn = self._connection()
+        for start in range(0, len(keys), self.BATCH_SIZE):
+            batch = keys[start:start + self.BATCH_SIZE]
+            rows = conn.execute(
+                f"SELECT key, preprocess, sentiment, confidence FROM results WHERE key IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            for key, preprocess, sentiment, confidence in rows:
+                found[positions[key]] = (preprocess, sentiment, confidence)
+        with self._lock:
+            self.stats['hits'] += len(found)
+            self.stats['misses'] += len(keys) - len(found)
+        return found
+
+    def put_many(self, texts, preprocessed, sentiments, confidences, version):
+        rows = list(zip(self.keys(texts, version), preprocessed, sentiments, confidences))
+        conn = self._connection()
+        with conn:
+            stored = conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            if stored is None or stored[0] != version:
+                conn.execute("DELETE FROM results")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+            conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows)
+
+    def info(self):
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {**self.stats, 'hit_ratio': self.stats['hits'] / lookups if lookups else 0.0}
+
+# Satu cache per proses server, dipakai bersama oleh semua session & rerun
+result_cache = ResultCache(RESULT_CACHE_MAX_MB * 1024 * 1024, RESULT_CACHE_DIR, RESULT_CACHE_DISK_MAX_MB * 1024 * 1024)
+artifact_cache = ArtifactCache(ARTIFACT_CACHE_MAX_ENTRIES, ARTIFACT_CACHE_MAX_MB * 1024 * 1024)
+text_store = TextResultStore(TEXT_STORE_PATH) if TEXT_STORE_PATH else None
+register_cache('result', result_cache.info)
+register_cache('artifact', artifact_cache.info)
+if text_store is not None:
+    register_cache('text_store', text_store.info)
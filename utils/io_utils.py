@@ -0,0 +1,166 @@
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+from utils.metrics_utils import timed
+
+CONTENT_COLUMN = 'content'
+
+class MissingContentColumnError(ValueError):
+    pass
+
+# --- Baca seluruh file sekaligus (upload kecil) ---
+def read_uploaded_file(file, filename):
+    with timed("read"):
+        if filename.endswith('.csv'):
+            df = pd.read_csv(file)
+        else:
+            df = pd.read_excel(file)
+    # Sel content kosong dibaca sebagai string kosong supaya preprocessing tidak error
+    if CONTENT_COLUMN in df.columns:
+        df[CONTENT_COLUMN] = df[CONTENT_COLUMN].fillna('').astype(str)
+    return df
+
+def _check_columns(header, extra_columns):
+    if CONTENT_COLUMN not in header:
+        raise MissingContentColumnError(f"Column '{CONTENT_COLUMN}' not found")
+    for column in extra_columns:
+        if column not in header:
+            raise ValueError(f"Column '{column}' not found")
+
+# Kolom teks: content + text_columns (mis. label untuk training). Nilai kosong -> '' dan semua sebagai string
+def _text_columns(text_columns):
+    return [CONTENT_COLUMN, *(column for column in text_columns if column != CONTENT_COLUMN)]
+
+# Kolom lain tetap dengan dtype asli (mis. score tetap angka). Kolom campuran angka & teks (Excel/JSONL)
+# dijadikan string, supaya tetap bisa ditulis ke Parquet
+def _finish_chunk(chunk, text_columns, start):
+    for column in chunk.columns:
+        values = chunk[column]
+        if column in text_columns:
+            chunk[column] = values.fillna('').astype(str)
+        elif values.dtype == object and pd.api.types.infer_dtype(values, skipna=True).startswith('mixed'):
+            chunk[column] = values.astype(str).where(values.notna())
+    chunk.index = pd.RangeIndex(start, start + len(chunk))
+    return chunk
+
+# --- Baca file per chunk, hanya kolom content (+ extra_columns, mis. label untuk training atau kolom yang
+# disalin ke hasil cli.py) ---
+def iter_csv_chunks(file, chunk_size, extra_columns=(), text_columns=()):
+    header = pd.read_csv(file, nrows=0)
+    _check_columns(list(header.columns), extra_columns)
+    file.seek(0)
+    columns = [CONTENT_COLUMN, *extra_columns]
+    text_columns = _text_columns(text_columns)
+    # Kolom teks dibaca apa adanya ("NA" tetap teks); di kolom lain hanya sel kosong yang menjadi NaN
+    start = 0
+    for chunk in pd.read_csv(
+        file, usecols=columns, dtype={column: str for column in text_columns}, keep_default_na=False,
+        na_values={column: [''] for column in columns if column not in text_columns}, chunksize=chunk_size
+    ):
+        yield _finish_chunk(chunk, text_columns, start)
+        start += len(chunk)
+
+def iter_excel_chunks(file, chunk_size, extra_columns=(), text_columns=()):
+    # Mode read-only openpyxl: baris dibaca satu per satu, tidak memuat seluruh sheet
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        _check_columns(header, extra_columns)
+        columns = [CONTENT_COLUMN, *extra_columns]
+        positions = [header.index(column) for column in columns]
+        text_columns = _text_columns(text_columns)
+        # Sel kolom teks langsung jadi string (angka 5 -> '5', bukan '5.0' setelah kolom menjadi float)
+        is_text = [column in text_columns for column in columns]
+
+        start = 0
+        buffer = []
+        for row in rows:
+            values = [row[position] if position < len(row) else None for position in positions]
+            buffer.append(tuple(
+                ('' if value is None else str(value)) if text else value for value, text in zip(values, is_text)
+            ))
+            if len(buffer) == chunk_size:
+                yield _finish_chunk(pd.DataFrame(buffer, columns=columns), text_columns, start)
+                start += len(buffer)
+                buffer = []
+        if buffer:
+            yield _finish_chunk(pd.DataFrame(buffer, columns=columns), text_columns, start)
+    finally:
+        workbook.close()
+
+def iter_jsonl_chunks(file, chunk_size, extra_columns=(), text_columns=()):
+    columns = [CONTENT_COLUMN, *extra_columns]
+    text_columns = _text_columns(text_columns)
+    start = 0
+    with pd.read_json(file, lines=True, chunksize=chunk_size, dtype=False) as reader:
+        for chunk in reader:
+            _check_columns(list(chunk.columns), extra_columns)
+            yield _finish_chunk(chunk[columns].copy(), text_columns, start)
+            start += len(chunk)
+
+def iter_parquet_chunks(file, chunk_size, extra_columns=(), text_columns=()):
+    parquet = pq.ParquetFile(file)
+    _check_columns(parquet.schema_arrow.names, extra_columns)
+    columns = [CONTENT_COLUMN, *extra_columns]
+    text_columns = _text_columns(text_columns)
+    start = 0
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+        yield _finish_chunk(batch.to_pandas(), text_columns, start)
+        start += batch.num_rows
+
+# CSV & JSONL dibaca berurutan, jadi posisi baca file bisa dipakai sebagai progress
+def is_text_format(filename):
+    return filename.lower().endswith(('.csv', '.jsonl', '.ndjson'))
+
+# Jumlah baris data dari metadata file (Parquet: footer, Excel: dimensi sheet) tanpa membaca isinya;
+# None jika tidak diketahui. Posisi file dikembalikan seperti semula
+def count_rows(file, filename):
+    filename = filename.lower()
+    if is_text_format(filename):
+        return None
+    position = file.tell()
+    try:
+        if filename.endswith('.parquet'):
+            return pq.ParquetFile(file).metadata.num_rows
+        workbook = load_workbook(file, read_only=True)
+        try:
+            max_row = workbook.worksheets[0].max_row
+        finally:
+            workbook.close()
+        return max_row - 1 if max_row else None
+    finally:
+        file.seek(position)
+
+def iter_content_chunks(file, filename, chunk_size, extra_columns=(), text_columns=()):
+    filename = filename.lower()
+    if filename.endswith('.csv'):
+        return iter_csv_chunks(file, chunk_size, extra_columns, text_columns)
+    if filename.endswith(('.jsonl', '.ndjson')):
+        return iter_jsonl_chunks(file, chunk_size, extra_columns, text_columns)
+    if filename.endswith('.parquet'):
+        return iter_parquet_chunks(file, chunk_size, extra_columns, text_columns)
+    return iter_excel_chunks(file, chunk_size, extra_columns, text_columns)
+
+# --- Export hasil (tab Download): nama format -> (ekstensi, mime) ---
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+# Parquet ditulis langsung dari buffer kolom Arrow (tanpa format teks per sel), jauh lebih cepat & kecil dari Excel
+def export_dataframe(df, fmt):
+    with timed(f"export.{fmt.lower()}", rows=len(df)):
+        if fmt == 'CSV':
+            return df.to_csv(index=False).encode('utf-8')
+        buffer = io.BytesIO()
+        if fmt == 'Excel':
+            df.to_excel(buffer, index=False)
+        elif fmt == 'Parquet':
+            df.to_parquet(buffer, index=False, compression='zstd')
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+        return buffer.getvalue()
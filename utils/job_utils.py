@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Antrian job di background (thread pool lokal, tanpa broker) ---
+# Script Streamlit cukup submit lalu polling progress. Job tetap jalan walau user ganti menu atau rerun,
+# dan hasilnya diambil rerun berikutnya (session mana pun) lewat kunci job, mis. dataset_key.
+# Pekerjaan berat tetap di process pool pipeline; thread job hanya mengatur chunk & progress.
+JOB_WORKERS = int(os.environ.get('LADS_JOB_WORKERS', 2))
+# Job selesai yang belum diambil disimpan maksimal sebanyak ini (yang paling lama dibuang)
+JOB_HISTORY = int(os.environ.get('LADS_JOB_HISTORY', 16))
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+class JobCancelled(Exception):
+    pass
+
+class Job:
+    def __init__(self, key):
+        self.key = key
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+
+    # Dipanggil fungsi job setiap chunk selesai, sekaligus titik pembatalan
+    def report(self, progress=None, message=None):
+        if progress is not None:
+            self.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+class JobManager:
+    def __init__(self, max_workers, history=JOB_HISTORY):
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='lads-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    # func(job, *args, **kwargs) -> hasil job. Job dengan kunci sama yang masih tersimpan dipakai ulang,
+    # jadi rerun & session lain dengan file yang sama tidak memulai analisis baru
+    def submit(self, key, func, *args, **kwargs):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                return job
+            job = Job(key)
+            self._jobs[key] = job
+            self._trim()
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        try:
+            if job.cancel_requested:
+                raise JobCancelled()
+            job.status = RUNNING
+            job.started_at = time.time()
+            job.result = func(job, *args, **kwargs)
+            job.progress = 1.0
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = e
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    # Hapus job dari daftar (hasil sudah diambil, atau job gagal/dibatalkan boleh dimulai ulang)
+    def pop(self, key):
+        with self._lock:
+            return self._jobs.pop(key, None)
+
+    def cancel(self, key):
+        job = self.get(key)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def _trim(self):
+        finished = [key for key, job in self._jobs.items() if job.finished]
+        for key in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[key]
+
+    def info(self):
+        with self._lock:
+            counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+# Satu manager per proses server, dipakai bersama oleh semua session
+job_manager = JobManager(JOB_WORKERS)
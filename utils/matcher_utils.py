@@ -0,0 +1,57 @@
+# --- Trie frasa per kata: cocokkan entri satu/multi kata dalam satu kali scan ---
+# Dari kiri ke kanan, ambil kecocokan terpanjang di tiap posisi lalu lompat ke setelahnya.
+_END = object()
+
+class PhraseMatcher:
+    # mapping: frasa -> pengganti (string), atau None untuk menghapus frasa
+    def __init__(self, mapping):
+        self._root = {}
+        self.max_words = 0
+        for phrase, replacement in mapping.items():
+            words = phrase.split()
+            if not words:
+                continue
+            node = self._root
+            for word in words:
+                node = node.setdefault(word, {})
+            node[_END] = replacement
+            self.max_words = max(self.max_words, len(words))
+
+    def __len__(self):
+        return len(self._root)
+
+    def replace(self, words):
+        output = []
+        root = self._root
+        i = 0
+        n = len(words)
+        while i < n:
+            node = root.get(words[i])
+            if node is None:
+                # Jalur cepat: kata tidak mengawali entri mana pun
+                output.append(words[i])
+                i += 1
+                continue
+
+            match_end = -1
+            replacement = None
+            j = i
+            while True:
+                if _END in node:
+                    match_end = j
+                    replacement = node[_END]
+                j += 1
+                if j >= n:
+                    break
+                node = node.get(words[j])
+                if node is None:
+                    break
+
+            if match_end < 0:
+                output.append(words[i])
+                i += 1
+            else:
+                if replacement is not None:
+                    output.append(replacement)
+                i = match_end + 1
+        return output
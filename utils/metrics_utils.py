@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+
+# --- Metrik hot path: timer & counter per tahap, rasio hit cache, RSS proses ---
+# Aktif lewat LADS_METRICS=1. Saat nonaktif, timed() mengembalikan context manager kosong yang sama
+# (tanpa perf_counter, tanpa lock), jadi overhead-nya cuma satu pengecekan flag.
+# LADS_METRICS_FILE: file teks format Prometheus (untuk textfile collector node_exporter).
+METRICS_FILE = os.environ.get('LADS_METRICS_FILE')
+
+_state = {'enabled': os.environ.get('LADS_METRICS', '0') == '1'}
+_lock = threading.Lock()
+# nama tahap -> {'calls', 'seconds', 'max_seconds', 'rows'}
+_timers = {}
+# nama cache -> fungsi yang mengembalikan dict dengan 'hits' & 'misses'
+_collectors = {}
+
+def metrics_enabled():
+    return _state['enabled']
+
+def set_metrics_enabled(enabled):
+    _state['enabled'] = bool(enabled)
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_time(self.name, time.perf_counter() - self.start, self.rows)
+        return False
+
+# with timed('classify', rows=len(texts)): ...
+def timed(name, rows=None):
+    if not _state['enabled']:
+        return _NULL_TIMER
+    return _Timer(name, rows)
+
+def record_time(name, seconds, rows=None, calls=1):
+    with _lock:
+        timer = _timers.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0})
+        timer['calls'] += calls
+        timer['seconds'] += seconds
+        timer['max_seconds'] = max(timer['max_seconds'], seconds)
+        timer['rows'] += rows or 0
+
+def timer_snapshot():
+    with _lock:
+        return {name: dict(timer) for name, timer in _timers.items()}
+
+# Ambil & kosongkan timer (dipakai worker process untuk mengirim metrik per chunk ke proses utama)
+def drain_timers():
+    with _lock:
+        timers = {name: dict(timer) for name, timer in _timers.items()}
+        _timers.clear()
+    return timers
+
+def merge_timers(timers):
+    if not timers:
+        return
+    with _lock:
+        for name, other in timers.items():
+            timer = _timers.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0})
+            timer['calls'] += other['calls']
+            timer['seconds'] += other['seconds']
+            timer['max_seconds'] = max(timer['max_seconds'], other['max_seconds'])
+            timer['rows'] += other['rows']
+
+# --- Cache: tiap modul mendaftarkan fungsi info()-nya sendiri ---
+def register_cache(name, info):
+    _collectors[name] = info
+
+def cache_snapshot():
+    snapshot = {}
+    for name, info in _collectors.items():
+        stats = info()
+        hits = stats.get('hits', 0) + stats.get('disk_hits', 0) + stats.get('known_hits', 0)
+        lookups = hits + stats.get('misses', 0)
+        snapshot[name] = {'hits': hits, 'misses': stats.get('misses', 0),
+                          'hit_ratio': hits / lookups if lookups else 0.0}
+    return snapshot
+
+# --- RSS proses (byte): /proc di Linux, selain itu puncak RSS dari resource ---
+def process_rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+    except (ImportError, AttributeError):
+        return None
+
+# --- Export format teks Prometheus ---
+def prometheus_text():
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+    timers = timer_snapshot()
+    metric('lads_stage_calls_total', 'counter', "Number of times a pipeline stage ran",
+           [({'stage': name}, timer['calls']) for name, timer in timers.items()])
+    metric('lads_stage_seconds_total', 'counter', "Total seconds spent in a pipeline stage",
+           [({'stage': name}, f"{timer['seconds']:.6f}") for name, timer in timers.items()])
+    metric('lads_stage_seconds_max', 'gauge', "Slowest single run of a pipeline stage",
+           [({'stage': name}, f"{timer['max_seconds']:.6f}") for name, timer in timers.items()])
+    metric('lads_stage_rows_total', 'counter', "Rows processed by a pipeline stage",
+           [({'stage': name}, timer['rows']) for name, timer in timers.items()])
+
+    caches = cache_snapshot()
+    metric('lads_cache_hits_total', 'counter', "Cache hits",
+           [({'cache': name}, cache['hits']) for name, cache in caches.items()])
+    metric('lads_cache_misses_total', 'counter', "Cache misses",
+           [({'cache': name}, cache['misses']) for name, cache in caches.items()])
+    metric('lads_cache_hit_ratio', 'gauge', "Cache hit ratio",
+           [({'cache': name}, f"{cache['hit_ratio']:.6f}") for name, cache in caches.items()])
+
+    rss = process_rss_bytes()
+    if rss is not None:
+        metric('lads_process_resident_memory_bytes', 'gauge', "Resident memory of this process", [({}, rss)])
+    return '\n'.join(lines) + '\n'
+
+# Tulis atomik (file sementara + os.replace) supaya collector tidak membaca file setengah jadi
+def write_prometheus_file(path=None):
+    path = path or METRICS_FILE
+    if not path:
+        return None
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+    return path
@@ -1,15 +1,53 @@
+import os
 import joblib
+import numpy as np
+import pandas as pd
+
+# Bundle model aktif; bisa diarahkan ke artifact hasil train.py lewat LADS_MODEL_PATH
+MODEL_PATH = os.environ.get('LADS_MODEL_PATH', 'mnb_model.pkl')
+
+# Label sentimen sebagai categorical: kode 0 = negative, 1 = positive (sama dengan kelas model)
+SENTIMENT_LABELS = ['negative', 'positive']
+SENTIMENT_DTYPE = pd.CategoricalDtype(SENTIMENT_LABELS)
+
+# Teks sebanyak ini di-transform & diprediksi per kali, supaya matriks TF-IDF tidak dibuat sekaligus
+CLASSIFY_CHUNK_SIZE = int(os.environ.get('LADS_CLASSIFY_CHUNK_SIZE', 50000))
+# Ulasan dengan confidence di bawah batas ini ditandai "low confidence"
+LOW_CONFIDENCE_THRESHOLD = float(os.environ.get('LADS_LOW_CONFIDENCE', 0.6))
 
 # Function untuk load model & vectorizer dari file .pkl
-def load_model():
-    bundle = joblib.load('mnb_model.pkl')
+# mmap_mode='r': array numpy di dalam bundle dibaca lewat memory-map (dibagi antar proses)
+def load_model(path=None, mmap_mode=None):
+    bundle = joblib.load(path or MODEL_PATH, mmap_mode=mmap_mode)
     return bundle['model'], bundle['vectorizer']
 
-# Function untuk klasifikasi sentimen
-def classify_sentiment(model, vectorizer, texts):
-    # Transform text ke TF-IDF
-    tfidf = vectorizer.transform(texts)
-    # Prediksi
-    preds = model.predict(tfidf)
-    # Konversi output menjadi label "positive" atau "negative"
-    return ['positive' if p == 1 else 'negative' for p in preds]
+# Klasifikasi per chunk: label categorical + probabilitas kelas positif (None jika with_proba=False)
+def classify_batch(model, vectorizer, texts, with_proba=True, chunk_size=CLASSIFY_CHUNK_SIZE):
+    texts = texts if isinstance(texts, list) else list(texts)
+    positive_index = list(model.classes_).index(1)
+    codes = np.empty(len(texts), dtype=np.int8)
+    proba = np.empty(len(texts), dtype=np.float64) if with_proba else None
+    for start in range(0, len(texts), chunk_size):
+        end = start + chunk_size
+        # Transform text ke TF-IDF, lalu prediksi
+        tfidf = vectorizer.transform(texts[start:end])
+        codes[start:end] = model.predict(tfidf) == 1
+        if with_proba:
+            proba[start:end] = model.predict_proba(tfidf)[:, positive_index]
+    return pd.Categorical.from_codes(codes, dtype=SENTIMENT_DTYPE), proba
+
+# Confidence = probabilitas kelas yang diprediksi
+def confidence_from_proba(proba_positive):
+    return np.maximum(proba_positive, 1 - proba_positive)
+
+# Function untuk klasifikasi sentimen (label sebagai list of str)
+def classify_sentiment(model, vectorizer, texts, return_proba=False):
+    labels, proba = classify_batch(model, vectorizer, texts, with_proba=return_proba)
+    if return_proba:
+        return labels.tolist(), proba
+    return labels.tolist()
+
+# Posisi baris per label, dihitung sekali lalu dipakai ulang (tanpa membandingkan string berulang kali)
+def sentiment_group_index(sentiment):
+    codes = pd.Categorical(sentiment, dtype=SENTIMENT_DTYPE).codes
+    return {label: np.flatnonzero(codes == code) for code, label in enumerate(SENTIMENT_LABELS)}
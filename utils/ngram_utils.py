@@ -0,0 +1,75 @@
+import heapq
+from collections import Counter
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+from utils.metrics_utils import timed
+
+# --- Top-k dari array frekuensi tanpa sort seluruh vocabulary ---
+# Urutan sama dengan sorted(..., reverse=True): frekuensi turun, seri diurutkan sesuai urutan vocabulary
+def select_top_k(counts, k):
+    indices = np.flatnonzero(counts)
+    values = counts[indices]
+    if len(values) > k:
+        kth_value = np.partition(values, len(values) - k)[len(values) - k]
+        keep = values >= kth_value
+        indices, values = indices[keep], values[keep]
+    order = np.lexsort((indices, -values))[:k]
+    return indices[order], values[order]
+
+# --- Hitung top n-gram untuk semua label sekaligus (satu kali fit, matriks tetap sparse) ---
+def top_ngrams_by_label(texts, labels, ngram_range=(3, 3), n=10):
+    codes, label_names = pd.factorize(np.asarray(labels))
+    vectorizer = CountVectorizer(stop_words='english', ngram_range=ngram_range)
+    try:
+        X = vectorizer.fit_transform(texts)
+    except ValueError:
+        # Semua teks kosong / hanya stopword
+        return {label: [] for label in label_names}
+
+    # Matriks indikator (label x dokumen) @ X -> frekuensi per label, tanpa X.toarray()
+    indicator = sp.csr_matrix(
+        (np.ones(len(codes), dtype=X.dtype), (codes, np.arange(len(codes)))),
+        shape=(len(label_names), X.shape[0])
+    )
+    counts_per_label = (indicator @ X).toarray()
+
+    selected = {label: select_top_k(counts_per_label[i], n) for i, label in enumerate(label_names)}
+    wanted = set()
+    for indices, _ in selected.values():
+        wanted.update(indices.tolist())
+    terms = {index: term for term, index in vectorizer.vocabulary_.items() if index in wanted}
+
+    return {
+        label: [(terms[index], int(count)) for index, count in zip(indices.tolist(), values.tolist())]
+        for label, (indices, values) in selected.items()
+    }
+
+# --- Versi inkremental (per chunk) untuk data yang tidak muat di memori ---
+# Frekuensi dijumlahkan per label; hasil top() sama dengan top_ngrams_by_label pada seluruh data
+class NgramCounter:
+    def __init__(self, ngram_range=(3, 3)):
+        self.ngram_range = ngram_range
+        self._analyze = CountVectorizer(stop_words='english', ngram_range=ngram_range).build_analyzer()
+        self.counts = {}
+
+    def update(self, texts, labels):
+        for text, label in zip(texts, labels):
+            self.counts.setdefault(label, Counter()).update(self._analyze(text))
+        return self
+
+    def top(self, n=10):
+        return {
+            label: heapq.nsmallest(n, counter.items(), key=lambda item: (-item[1], item[0]))
+            for label, counter in self.counts.items()
+        }
+
+    def top_by_sentiment(self, n=10):
+        top_ngrams = self.top(n)
+        return {label: top_ngrams.get(label, []) for label in ('positive', 'negative')}
+
+def top_ngrams_by_sentiment(df, ngram_range=(3, 3), n=10):
+    with timed("top_ngrams", rows=len(df)):
+        top_ngrams = top_ngrams_by_label(df['content'].astype(str), df['Sentiment'], ngram_range, n)
+    return {label: top_ngrams.get(label, []) for label in ('positive', 'negative')}
@@ -1,69 +1,121 @@
 from fpdf import FPDF
+from fpdf.enums import XPos, YPos
 from datetime import datetime
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import io
 import re
-import matplotlib.pyplot as plt
-import os
-from sklearn.feature_extraction.text import CountVectorizer
+from utils.metrics_utils import drain_timers, merge_timers, metrics_enabled, timed
+from utils.model_utils import sentiment_group_index
+from utils.ngram_utils import top_ngrams_by_sentiment
+from utils.render_utils import (
+    WORDCLOUD_SIZE, render_summary_chart_png, render_top_ngrams_chart_png, render_wordcloud_frequencies_png,
+    token_frequencies, wordcloud_image_name
+)
 
 # Fungsi hapus emoji atau karakter non-ASCII
 def remove_emojis(text):
     return re.sub(r'[^\x00-\x7F]+', '', text)
 
-# Fungsi buat top n-gram chart & simpan ke file gambar
-def save_top_ngrams_chart(text_series, sentiment_label, ngram_range=(3,3), n=5):
-    vectorizer = CountVectorizer(stop_words='english', ngram_range=ngram_range)
-    X = vectorizer.fit_transform(text_series)
-    counts = X.toarray().sum(axis=0)
-    ngrams_freq = dict(zip(vectorizer.get_feature_names_out(), counts))
-    top_ngrams = sorted(ngrams_freq.items(), key=lambda x: x[1], reverse=True)[:n]
-
-    if top_ngrams:
-        ngrams, freqs = zip(*top_ngrams)
-        plt.figure(figsize=(8, 4))
-        plt.barh(ngrams, freqs, color='#7F55B1')
-        plt.xlabel("Frequency")
-        plt.title(f"Top Trigrams - {sentiment_label}")
-        plt.gca().invert_yaxis()
-        if not os.path.exists("temp"):
-            os.makedirs("temp")
-        filename = f"temp/top_ngrams_{sentiment_label.lower()}.png"
-        plt.tight_layout()
-        plt.savefig(filename)
-        plt.close()
-        return filename
-    return None
+# --- Gambar untuk report: dirender paralel di worker pool, disimpan sebagai PNG bytes ---
+REPORT_IMAGE_WORKERS = 5
+_report_executor = ThreadPoolExecutor(max_workers=REPORT_IMAGE_WORKERS)
+
+# Nama gambar -> (fungsi render, fungsi pembuat argumen). Argumen dibuat hanya untuk gambar yang belum ada di cache
+# groups: hasil sentiment_group_index (posisi baris per label), dihitung sendiri jika tidak diberikan
+# word_frequencies: {label: frekuensi token} yang sudah dihitung (cache app, akumulasi per chunk di cli.py);
+# jika tidak diberikan dihitung dari kolom preprocess. Wordcloud PDF selalu ukuran penuh (WORDCLOUD_SIZE).
+def report_image_tasks(df, stats, top_ngrams, groups=None, word_frequencies=None):
+    if groups is None and word_frequencies is None:
+        groups = sentiment_group_index(df['Sentiment'])
+    tasks = {'summary_chart': (render_summary_chart_png, lambda: (stats.count('positive'), stats.count('negative')))}
+    for label in ('positive', 'negative'):
+        if not stats.count(label):
+            continue
+        if word_frequencies is not None:
+            make_args = lambda label=label: (word_frequencies[label], *WORDCLOUD_SIZE)
+        else:
+            texts = df['preprocess'].iloc[groups[label]]
+            make_args = lambda texts=texts: (token_frequencies(texts.astype(str).tolist()), *WORDCLOUD_SIZE)
+        tasks[wordcloud_image_name(label)] = (render_wordcloud_frequencies_png, make_args)
+        if top_ngrams[label]:
+            title = f"Top Trigrams - {label.capitalize()}"
+            tasks[f'top_ngrams_{label}'] = (render_top_ngrams_chart_png, lambda label=label, title=title: (top_ngrams[label][:5], title))
+    return tasks
+
+# cache/dataset_key: gambar yang sudah dirender (mis. di tab Wordcloud) dipakai ulang
+def build_report_images(df, stats, top_ngrams, executor=None, cache=None, dataset_key=None, groups=None,
+                        word_frequencies=None):
+    with timed("report_images"):
+        tasks = report_image_tasks(df, stats, top_ngrams, groups, word_frequencies)
+        return _build_report_images(tasks, executor or _report_executor, cache, dataset_key)
+
+# Render di process pool: timer (mis. "wordcloud") tercatat di worker, jadi dikirim balik bersama gambarnya
+def _render_in_worker(render, *args):
+    return render(*args), drain_timers() if metrics_enabled() else None
+
+def _build_report_images(tasks, executor, cache, dataset_key):
+    in_process_pool = isinstance(executor, ProcessPoolExecutor)
+    images = {}
+    futures = {}
+    for name, (render, make_args) in tasks.items():
+        cached = cache.get((dataset_key, name)) if cache is not None else None
+        if cached is not None:
+            images[name] = cached
+        elif in_process_pool:
+            futures[name] = executor.submit(_render_in_worker, render, *make_args())
+        else:
+            futures[name] = executor.submit(render, *make_args())
+
+    for name, future in futures.items():
+        if in_process_pool:
+            images[name], timers = future.result()
+            merge_timers(timers)
+        else:
+            images[name] = future.result()
+        if cache is not None:
+            cache.put((dataset_key, name), images[name])
+    return images
 
 # Membuat summary PDF
-def create_summary_pdf(df, count_positive, count_negative, percent_positive, percent_negative, positive_texts_exist, negative_texts_exist):
+# stats: SentimentStats dataset ini (jumlah, persentase, rata-rata panjang & contoh teks)
+def create_summary_pdf(df, stats, top_ngrams=None, images=None, groups=None):
+    # top_ngrams: hasil top_ngrams_by_sentiment yang sudah dihitung di halaman Summary (dipakai ulang)
+    if top_ngrams is None:
+        top_ngrams = top_ngrams_by_sentiment(df)
+    # images: PNG bytes dari build_report_images
+    if images is None:
+        images = build_report_images(df, stats, top_ngrams, groups=groups)
+
+    with timed("pdf"):
+        return _layout_summary_pdf(stats, images)
+
+# Layout halaman PDF dari statistik & gambar yang sudah jadi
+def _layout_summary_pdf(stats, images):
+    positive_texts_exist = stats.count('positive') > 0
+    negative_texts_exist = stats.count('negative') > 0
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
 
     # Header
-    pdf.set_font("Arial", "B", 18)
-    pdf.cell(0, 10, "Sentiment Analysis Of Love And Deepspace", ln=True, align='C')
+    pdf.set_font("Helvetica", "B", 18)
+    pdf.cell(0, 10, "Sentiment Analysis Of Love And Deepspace", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     pdf.ln(5)
 
-    total = count_positive + count_negative
-
-    # Average text length
-    df['TextLength'] = df['content'].astype(str).apply(lambda x: len(x.split()))
-    avg_length_positive = df[df['Sentiment'] == 'positive']['TextLength'].mean()
-    avg_length_negative = df[df['Sentiment'] == 'negative']['TextLength'].mean()
-
     # Date generated
     date_now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # Ringkasan statistik
-    pdf.set_font("Arial", "", 12)
+    pdf.set_font("Helvetica", "", 12)
     pdf.multi_cell(0, 8,
-        f"Total data: {total}\n"
-        f"Positive: {count_positive} ({percent_positive}%)\n"
-        f"Negative: {count_negative} ({percent_negative}%)\n"
-        f"Average text length (positive): {avg_length_positive:.1f} words\n"
-        f"Average text length (negative): {avg_length_negative:.1f} words\n"
-        f"Date generated: {date_now}"
+        f"Total data: {stats.total}\n"
+        f"Positive: {stats.count('positive')} ({stats.percent('positive')}%)\n"
+        f"Negative: {stats.count('negative')} ({stats.percent('negative')}%)\n"
+        f"Average text length (positive): {stats.average_length('positive'):.1f} words\n"
+        f"Average text length (negative): {stats.average_length('negative'):.1f} words\n"
+        f"Date generated: {date_now}",
+        new_x=XPos.LMARGIN, new_y=YPos.NEXT
     )
     pdf.ln(5)
 
@@ -74,66 +126,60 @@ def create_summary_pdf(df, count_positive, count_negative, percent_positive, per
     pdf.ln(5)
 
     # Chart summary
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(0, 10, "Sentiment Summary Chart", ln=True)
-    pdf.image("temp/summary_chart.png", w=180)
+    pdf.set_font("Helvetica", "B", 14)
+    pdf.cell(0, 10, "Sentiment Summary Chart", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.image(io.BytesIO(images['summary_chart']), w=180)
     pdf.ln(10)
 
-    # Wordcloud Positive
-    if positive_texts_exist:
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(0, 10, "Wordcloud Positive", ln=True)
-        pdf.image("temp/wordcloud_positive.png", w=180)
+    # Wordcloud Positive (tidak ada gambar jika semua teks kosong setelah preprocessing)
+    if positive_texts_exist and images.get(wordcloud_image_name('positive')):
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, "Wordcloud Positive", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.image(io.BytesIO(images[wordcloud_image_name('positive')]), w=180)
         pdf.ln(10)
 
     # Wordcloud Negative
-    if negative_texts_exist:
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(0, 10, "Wordcloud Negative", ln=True)
-        pdf.image("temp/wordcloud_negative.png", w=180)
+    if negative_texts_exist and images.get(wordcloud_image_name('negative')):
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, "Wordcloud Negative", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.image(io.BytesIO(images[wordcloud_image_name('negative')]), w=180)
         pdf.ln(10)
 
     # Example Positive Texts
     if positive_texts_exist:
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(0, 10, "Top 3 Positive Example Texts", ln=True)
-        pdf.set_font("Arial", "", 12)
-        pos_examples = df[df['Sentiment'] == 'positive']['content'].head(3).tolist()
-        for i, text in enumerate(pos_examples, 1):
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, "Top 3 Positive Example Texts", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.set_font("Helvetica", "", 12)
+        for i, text in enumerate(stats.examples['positive'], 1):
             clean_text = remove_emojis(text[:500].replace("\n", " "))
-            pdf.multi_cell(0, 8, f"{i}. {clean_text}")
+            pdf.multi_cell(0, 8, f"{i}. {clean_text}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             pdf.ln(2)
         pdf.ln(5)
 
     # Example Negative Texts
     if negative_texts_exist:
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(0, 10, "Top 3 Negative Example Texts", ln=True)
-        pdf.set_font("Arial", "", 12)
-        neg_examples = df[df['Sentiment'] == 'negative']['content'].head(3).tolist()
-        for i, text in enumerate(neg_examples, 1):
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, "Top 3 Negative Example Texts", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.set_font("Helvetica", "", 12)
+        for i, text in enumerate(stats.examples['negative'], 1):
             clean_text = remove_emojis(text[:500].replace("\n", " "))
-            pdf.multi_cell(0, 8, f"{i}. {clean_text}")
+            pdf.multi_cell(0, 8, f"{i}. {clean_text}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             pdf.ln(2)
         pdf.ln(5)
 
     # Top n-grams Positive 
-    if positive_texts_exist:
-        pos_filename = save_top_ngrams_chart(df[df['Sentiment'] == 'positive']['content'], "Positive")
-        if pos_filename:
-            pdf.set_font("Arial", "B", 14)
-            pdf.cell(0, 10, "Top Trigrams - Positive", ln=True)
-            pdf.image(pos_filename, w=180)
-            pdf.ln(10)
+    if positive_texts_exist and 'top_ngrams_positive' in images:
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, "Top Trigrams - Positive", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.image(io.BytesIO(images['top_ngrams_positive']), w=180)
+        pdf.ln(10)
 
     # Top n-grams Negative 
-    if negative_texts_exist:
-        neg_filename = save_top_ngrams_chart(df[df['Sentiment'] == 'negative']['content'], "Negative")
-        if neg_filename:
-            pdf.set_font("Arial", "B", 14)
-            pdf.cell(0, 10, "Top Trigrams - Negative", ln=True)
-            pdf.image(neg_filename, w=180)
-            pdf.ln(10)
-
-    # Simpan
-    pdf.output("summary_report.pdf")
+    if negative_texts_exist and 'top_ngrams_negative' in images:
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, "Top Trigrams - Negative", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.image(io.BytesIO(images['top_ngrams_negative']), w=180)
+        pdf.ln(10)
+
+    # PDF dikembalikan sebagai bytes (tidak ditulis ke file bersama, aman untuk banyak session sekaligus)
+    return bytes(pdf.output())
@@ -0,0 +1,359 @@
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.metrics_utils import drain_timers, merge_timers, metrics_enabled, timed
+from utils.model_utils import LOW_CONFIDENCE_THRESHOLD, SENTIMENT_DTYPE, classify_batch, confidence_from_proba
+from utils.stats_utils import SentimentStats, word_counts
+from utils.preprocessing_utils import FOLDED_COLUMNS, INTERMEDIATE_COLUMNS, clean_and_fold, preprocess_folded
+from utils.cache_utils import dataframe_nbytes, text_store
+from utils.io_utils import (
+    CONTENT_COLUMN, MissingContentColumnError, count_rows, is_text_format, iter_content_chunks, read_uploaded_file
+)
+from utils.resource_utils import get_model, get_slang_dict
+
+# Jumlah worker & ukuran chunk bisa diatur lewat environment variable
+DEFAULT_WORKERS = int(os.environ.get('LADS_WORKERS', os.cpu_count() or 1))
+DEFAULT_CHUNK_SIZE = int(os.environ.get('LADS_CHUNK_SIZE', 5000))
+# Worker tidak di-fork langsung dari proses app/server yang multi-thread (lock yang sedang dipegang thread lain
+# ikut tersalin & bisa deadlock): forkserver jika tersedia, selain itu spawn.
+# Catatan: worker baru mengimpor ulang script utama sebagai __mp_main__ (untuk Streamlit: app.py), jadi script
+# utama tidak boleh punya efek samping di luar `__name__ == '__main__'` (app.py: semua UI di dalam main())
+MP_START_METHOD = os.environ.get(
+    'LADS_MP_START_METHOD', 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+# Naikkan jika kolom hasil analisis berubah, supaya hasil lama di result cache tidak dipakai
+RESULT_SCHEMA_VERSION = 3
+# Kolom tahap preprocessing ikut disimpan di hasil app (~4x memori per baris); default dibuang dan
+# dihitung ulang hanya saat diminta (lihat preprocessing_utils.intermediate_columns)
+KEEP_INTERMEDIATE = os.environ.get('LADS_KEEP_INTERMEDIATE', '0') == '1'
+
+# --- Pipeline preprocess -> klasifikasi untuk satu DataFrame ---
+# Dedup: baris dengan hasil case folding yang sama (mis. "Good game!!" & "good game") hanya diproses &
+# diklasifikasi sekali, hasilnya disebar ke semua baris. Hasil identik dengan memproses tiap baris.
+# use_store: teks yang sudah pernah diproses (upload lain, restart) diambil dari text_store (SQLite).
+# df.attrs['dedup']: jumlah baris, teks unik, hit store, teks yang diproses & waktu tahap mahal
+def analyze_dataframe(df, model, vectorizer, slang_dict, keep_intermediate=True, use_store=False):
+    df = df.copy()
+    clean, folded, codes, unique_texts = _fold_and_factorize(df)
+    result, stats = analyze_unique_texts(unique_texts, model, vectorizer, slang_dict, keep_intermediate, use_store)
+    return _broadcast_results(df, clean, folded, codes, result, stats, keep_intermediate)
+
+# Hasil: teks bersih & hasil case folding per baris, kode teks unik per baris & daftar teks unik
+def _fold_and_factorize(df):
+    clean, folded = clean_and_fold(df['content'].tolist())
+    with timed("dedup", rows=len(folded)):
+        codes, unique_texts = pd.factorize(np.asarray(folded, dtype=object))
+    return clean, folded, codes, unique_texts.tolist()
+
+# Preprocess & klasifikasi teks unik (sudah di-fold); teks yang sudah ada di store tidak diproses ulang.
+# Hasil: ({kolom: nilai per teks unik}, statistik store_hits/processed/seconds)
+def analyze_unique_texts(unique_texts, model, vectorizer, slang_dict, keep_intermediate=True, use_store=False):
+    store = text_store if use_store else None
+    version = store.version() if store is not None else None
+    found = store.get_many(unique_texts, version) if store is not None else {}
+    missing = [i for i in range(len(unique_texts)) if i not in found]
+
+    preprocessed = np.empty(len(unique_texts), dtype=object)
+    sentiment_codes = np.empty(len(unique_texts), dtype=np.int8)
+    confidence = np.empty(len(unique_texts), dtype=np.float32)
+    for i, (text, code, score) in found.items():
+        preprocessed[i], sentiment_codes[i], confidence[i] = text, code, score
+
+    # Kolom tahap butuh semua teks unik; tanpa kolom tahap cukup teks yang belum ada di store
+    start = time.perf_counter()
+    process = range(len(unique_texts)) if keep_intermediate else missing
+    columns = preprocess_folded([unique_texts[i] for i in process], slang_dict, keep_intermediate)
+    result = {column: columns[column] for column in FOLDED_COLUMNS} if keep_intermediate else {}
+    preprocessed[list(process)] = columns['preprocess']
+
+    if missing:
+        texts_to_classify = preprocessed[missing].tolist()
+        with timed("classify", rows=len(texts_to_classify)):
+            labels, proba = classify_batch(model, vectorizer, texts_to_classify)
+        sentiment_codes[missing] = labels.codes
+        confidence[missing] = confidence_from_proba(proba)
+        if store is not None:
+            store.put_many([unique_texts[i] for i in missing], texts_to_classify, labels.codes.tolist(),
+                           confidence[missing].tolist(), version)
+
+    result['preprocess'] = preprocessed
+    result['sentiment_codes'] = sentiment_codes
+    result['confidence'] = confidence
+    result['token_counts'] = np.fromiter(
+        (len(text.split()) for text in preprocessed), dtype=np.int32, count=len(preprocessed)
+    )
+    stats = {'store_hits': len(found), 'processed': len(process), 'seconds': time.perf_counter() - start}
+    return result, stats
+
+# Gabungkan hasil analyze_unique_texts beberapa chunk teks unik (sesuai urutan)
+def _merge_unique_results(outputs, keep_intermediate):
+    result = {
+        column: [value for output, _ in outputs for value in output[column]]
+        for column in (FOLDED_COLUMNS if keep_intermediate else ())
+    }
+    for column in ('preprocess', 'sentiment_codes', 'confidence', 'token_counts'):
+        result[column] = np.concatenate([output[column] for output, _ in outputs])
+    stats = {name: sum(stats[name] for _, stats in outputs) for name in ('store_hits', 'processed', 'seconds')}
+    return result, stats
+
+# Sebar hasil per teks unik ke semua baris df (codes: indeks teks unik per baris)
+def _broadcast_results(df, clean, folded, codes, result, stats, keep_intermediate):
+    if keep_intermediate:
+        df['clean_content'] = clean
+        df['case_folding'] = folded
+        for column in FOLDED_COLUMNS:
+            df[column] = [result[column][code] for code in codes]
+    df['preprocess'] = result['preprocess'][codes].tolist()
+    df['Sentiment'] = pd.Categorical.from_codes(result['sentiment_codes'][codes], dtype=SENTIMENT_DTYPE)
+    df['Confidence'] = result['confidence'][codes]
+    df['LowConfidence'] = df['Confidence'].to_numpy() < LOW_CONFIDENCE_THRESHOLD
+    # Jumlah kata (content) & token (preprocess) dihitung sekali di sini, dipakai statistik & PDF
+    df['TextLength'] = word_counts(df['content'])
+    df['TokenCount'] = result['token_counts'][codes]
+    compact_string_columns(df)
+    df.attrs['dedup'] = {'rows': len(df), 'unique': len(result['preprocess']), **stats}
+    return df
+
+# --- Representasi hemat memori ---
+# Kolom teks disimpan sebagai string Arrow (buffer kontigu, bukan satu objek Python per sel).
+# pandas >= 3 sudah memakai Arrow untuk string secara default; versi lama (object) dikonversi di sini.
+TEXT_COLUMNS = ['content', *[column for column in INTERMEDIATE_COLUMNS if column != 'tokenized'], 'preprocess']
+
+def compact_string_columns(df):
+    for column in TEXT_COLUMNS:
+        if column in df.columns and df[column].dtype == object:
+            df[column] = df[column].astype('string[pyarrow]')
+    return df
+
+# Memori hasil analisis (byte total & per baris)
+def memory_footprint(df):
+    nbytes = dataframe_nbytes(df)
+    return {'bytes': nbytes, 'bytes_per_row': nbytes / len(df) if len(df) else 0.0}
+
+# --- Ringkasan dedup beberapa chunk ---
+def merge_dedup_stats(stats_list):
+    total = {'rows': 0, 'unique': 0, 'store_hits': 0, 'processed': 0, 'seconds': 0.0}
+    for stats in stats_list:
+        for name, value in (stats or {}).items():
+            total[name] += value
+    return total
+
+# Rasio duplikat & perkiraan waktu yang dihemat (waktu per teks yang diproses x baris yang dilewati).
+# seconds_saved None jika semua teks dari store (tidak ada waktu per teks untuk acuan)
+def dedup_summary(stats):
+    rows, processed = stats['rows'], stats['processed']
+    return {
+        **stats,
+        'duplicate_ratio': 1 - stats['unique'] / rows if rows else 0.0,
+        'seconds_saved': stats['seconds'] / processed * (rows - processed) if processed else None,
+    }
+
+# --- Worker process: model & slang dictionary dimuat saat worker start (warm-up) ---
+def _init_worker():
+    get_model()
+    get_slang_dict()
+
+# Hasil: (DataFrame, timer metrik dari worker ini atau None) -> timer digabung di proses utama
+def _analyze_chunk(chunk, keep_intermediate, use_store=False):
+    # get_model() & get_slang_dict() cek mtime file, jadi worker ikut memuat ulang setelah
+    # install_artifact / slang.txt berubah (hasil tetap cocok dengan versi di text_store)
+    model, vectorizer = get_model()
+    result = analyze_dataframe(
+        chunk, model, vectorizer, get_slang_dict(),
+        keep_intermediate=keep_intermediate, use_store=use_store
+    )
+    return result, drain_timers() if metrics_enabled() else None
+
+def _analyze_unique_chunk(unique_texts, keep_intermediate, use_store=False):
+    model, vectorizer = get_model()
+    output = analyze_unique_texts(unique_texts, model, vectorizer, get_slang_dict(), keep_intermediate, use_store)
+    return output, drain_timers() if metrics_enabled() else None
+
+def _collect_chunk(output):
+    result, timers = output
+    merge_timers(timers)
+    return result
+
+# Pool dibuat sekali per proses dan dipakai ulang di setiap rerun
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_process_pool(n_workers=DEFAULT_WORKERS):
+    with _pools_lock:
+        pool = _pools.get(n_workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=n_workers, mp_context=multiprocessing.get_context(MP_START_METHOD),
+                initializer=_init_worker
+            )
+            _pools[n_workers] = pool
+        return pool
+
+def shutdown_process_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+# Hasil func(chunk, *args) di process pool, sesuai urutan chunk
+def _iter_pool_results(func, chunks, n_workers, *args):
+    # Maksimal 2 chunk per worker yang sedang diproses, supaya memori tetap terbatas
+    pool = get_process_pool(n_workers)
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(func, chunk, *args))
+            if len(pending) >= 2 * n_workers:
+                yield _collect_chunk(pending.popleft().result())
+        while pending:
+            yield _collect_chunk(pending.popleft().result())
+    except BrokenProcessPool:
+        # Pool rusak (mis. worker di-kill), buang supaya request berikutnya membuat pool baru
+        with _pools_lock:
+            if _pools.get(n_workers) is pool:
+                del _pools[n_workers]
+        raise
+    finally:
+        # Generator ditutup lebih awal (job dibatalkan, error): chunk yang belum mulai tidak dikerjakan
+        for future in pending:
+            future.cancel()
+
+# Dedup per chunk; duplikat antar chunk tertangkap lewat text_store jika use_store
+def iter_analyzed_chunks(chunks, model, vectorizer, slang_dict, n_workers=DEFAULT_WORKERS, keep_intermediate=False,
+                         use_store=False):
+    if n_workers <= 1:
+        for chunk in chunks:
+            yield analyze_dataframe(chunk, model, vectorizer, slang_dict, keep_intermediate, use_store)
+        return
+    yield from _iter_pool_results(_analyze_chunk, chunks, n_workers, keep_intermediate, use_store)
+
+# Hasil analyze_unique_texts per chunk teks unik
+def iter_analyzed_texts(text_chunks, model, vectorizer, slang_dict, n_workers=DEFAULT_WORKERS, keep_intermediate=False,
+                        use_store=False):
+    if n_workers <= 1:
+        for texts in text_chunks:
+            yield analyze_unique_texts(texts, model, vectorizer, slang_dict, keep_intermediate, use_store)
+        return
+    yield from _iter_pool_results(_analyze_unique_chunk, text_chunks, n_workers, keep_intermediate, use_store)
+
+# --- Pipeline paralel dengan dedup global: teks di-fold & di-factorize sekali untuk seluruh DataFrame, hanya teks
+# unik yang dipecah per chunk ke process pool, lalu hasilnya disebar ke semua baris (statistik dedup per upload).
+# report(progress, message): dipanggil setiap chunk selesai (mis. job.report, sekaligus titik pembatalan)
+def analyze_dataframe_sharded(df, model, vectorizer, slang_dict, n_workers=DEFAULT_WORKERS,
+                              chunk_size=DEFAULT_CHUNK_SIZE, keep_intermediate=True, use_store=False, report=None):
+    df = df.copy()
+    clean, folded, codes, unique_texts = _fold_and_factorize(df)
+    text_chunks = [unique_texts[start:start + chunk_size] for start in range(0, len(unique_texts), chunk_size)]
+    # Jumlah baris per teks unik, untuk progress dalam satuan baris
+    text_rows = np.bincount(codes, minlength=len(unique_texts))
+
+    outputs = []
+    done = rows = positive = 0
+    analyzed = iter_analyzed_texts(text_chunks, model, vectorizer, slang_dict, n_workers, keep_intermediate, use_store)
+    try:
+        for output in analyzed:
+            outputs.append(output)
+            chunk_rows = text_rows[done:done + len(output[0]['preprocess'])]
+            done += len(chunk_rows)
+            rows += int(chunk_rows.sum())
+            positive += int(chunk_rows[output[0]['sentiment_codes'] == 1].sum())
+            if report is not None:
+                report(
+                    done / len(unique_texts),
+                    f"⏳ Processed {rows} rows — positive: {positive}, negative: {rows - positive}"
+                )
+    finally:
+        analyzed.close()
+    # DataFrame tanpa baris: kolom hasil tetap lengkap
+    if not outputs:
+        outputs = [analyze_unique_texts([], model, vectorizer, slang_dict, keep_intermediate)]
+
+    result, stats = _merge_unique_results(outputs, keep_intermediate)
+    return _broadcast_results(df, clean, folded, codes, result, stats, keep_intermediate)
+
+# --- Job analisis file upload (dijalankan job_manager di background thread, lihat job_utils) ---
+# data: isi file (bytes; dari app objek bytes yang sama dengan yang dipegang Streamlit, bukan salinan).
+# Progress per chunk lewat job.report(), yang juga titik pembatalan.
+# Non-streaming: dedup untuk seluruh file (analyze_dataframe_sharded).
+# streaming: file besar dibaca per chunk (hanya kolom content), dedup per chunk (+ text_store antar chunk).
+# Hasil tiap chunk langsung ditambahkan ke satu file Arrow IPC sementara, lalu file itu di-memory-map: kolom
+# DataFrame hasil menunjuk ke halaman file (page cache yang bisa dilepas OS), bukan salinan di heap. Memori
+# proses yang dipakai job jadi sebatas chunk yang sedang diproses (+ kode kategori/bool per baris).
+# File dihapus setelah di-map; isinya tetap terbaca sampai DataFrame dilepas (Linux/macOS).
+# Hasil: (DataFrame, SentimentStats)
+def analyze_file_job(job, data, filename, model, vectorizer, slang_dict, streaming=False,
+                     chunk_size=DEFAULT_CHUNK_SIZE, n_workers=DEFAULT_WORKERS, use_store=True,
+                     keep_intermediate=KEEP_INTERMEDIATE):
+    file = io.BytesIO(data)
+    if not streaming:
+        job.report(0.0, "Reading file...")
+        source = read_uploaded_file(file, filename)
+        if CONTENT_COLUMN not in source.columns:
+            raise MissingContentColumnError(f"Column '{CONTENT_COLUMN}' not found")
+        job.report(0.0, "Analyzing sentiments...")
+        with timed("analyze"):
+            df = analyze_dataframe_sharded(source, model, vectorizer, slang_dict, n_workers, chunk_size,
+                                           keep_intermediate, use_store, report=job.report)
+        return df, SentimentStats.from_dataframe(df)
+
+    # Progress: posisi baca untuk CSV/JSONL; Excel (zip dibaca tidak berurutan) & Parquet memakai jumlah baris
+    # dari metadata file, jika tidak ada hanya jumlah baris yang diproses yang ditampilkan
+    total_rows = None if is_text_format(filename) else count_rows(file, filename)
+    # Streaming (file besar) tidak pernah menyimpan kolom tahap
+    chunks = iter_content_chunks(file, filename, chunk_size)
+    stats = SentimentStats()
+    dedup = []
+    rows = 0
+    job.report(0.0, "Analyzing sentiments...")
+    # ignore_cleanup_errors: di Windows file yang masih di-map tidak bisa dihapus
+    result_dir = tempfile.TemporaryDirectory(prefix='lads-stream-', ignore_cleanup_errors=True)
+    with timed("analyze_streaming"), result_dir:
+        path = os.path.join(result_dir.name, 'result.arrow')
+        writer = None
+        analyzed = iter_analyzed_chunks(chunks, model, vectorizer, slang_dict, n_workers, False, use_store)
+        try:
+            for result in analyzed:
+                table = pa.Table.from_pandas(result, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = pa.ipc.new_file(path, schema)
+                writer.write_table(table.cast(schema))
+                dedup.append(result.attrs.get('dedup'))
+                stats.update(result)
+                rows += len(result)
+                if total_rows:
+                    progress = min(rows / total_rows, 1.0)
+                elif is_text_format(filename):
+                    progress = file.tell() / len(data) if data else 1.0
+                else:
+                    progress = None
+                job.report(
+                    progress,
+                    f"⏳ Processed {rows} rows — "
+                    f"positive: {stats.count('positive')}, negative: {stats.count('negative')}"
+                )
+        finally:
+            analyzed.close()
+            if writer is not None:
+                writer.close()
+
+        if writer is not None:
+            # Tanpa salinan: kolom string (Arrow) & numerik tanpa null langsung memakai buffer hasil map
+            df = pa.ipc.open_file(pa.memory_map(path)).read_all().to_pandas(split_blocks=True)
+        else:
+            # File tanpa baris: kolom hasil tetap lengkap
+            source = pd.DataFrame({CONTENT_COLUMN: pd.Series(dtype=str)})
+            df = analyze_dataframe(source, model, vectorizer, slang_dict, keep_intermediate=False)
+
+    df.attrs['dedup'] = merge_dedup_stats(dedup)
+    return df, stats
@@ -1,33 +1,23 @@
 import matplotlib.pyplot as plt
-import pandas as pd
-from wordcloud import WordCloud
-from sklearn.feature_extraction.text import CountVectorizer
 import streamlit as st
+from utils.ngram_utils import top_ngrams_by_label
+from utils.render_utils import WORDCLOUD_PREVIEW_SIZE, render_wordcloud_frequencies_png, token_frequencies
 
-# Membuat dan menampilkan wordcloud di Streamlit
-def generate_wordcloud(text_series, title):
-    text = " ".join(text_series)
-    wordcloud = WordCloud(width=800, height=400, background_color='white', colormap='magma').generate(text)
+# Menampilkan wordcloud (PNG bytes, bisa dari cache) di Streamlit
+def show_wordcloud(image, title):
     st.subheader(f"{title}")
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.imshow(wordcloud, interpolation='bilinear')
-    ax.axis("off")
-    st.pyplot(fig)
+    if image is None:
+        st.info("ℹ️ No words left after preprocessing.")
+    else:
+        st.image(image, width="stretch")
 
-# Menyimpan wordcloud ke file image
-def save_wordcloud_image(text_series, filename):
-    text = " ".join(text_series)
-    wordcloud = WordCloud(width=800, height=400, background_color='white', colormap='magma').generate(text)
-    wordcloud.to_file(filename)
+# Membuat dan menampilkan wordcloud di Streamlit (text_series: teks hasil preprocess)
+def generate_wordcloud(text_series, title, size=WORDCLOUD_PREVIEW_SIZE):
+    show_wordcloud(render_wordcloud_frequencies_png(token_frequencies(list(text_series)), *size), title)
 
 # Mendapatkan top n-grams (misalnya trigram)
 def get_top_ngrams(text_series, ngram_range=(3,3), n=10):
-    vectorizer = CountVectorizer(stop_words='english', ngram_range=ngram_range)
-    X = vectorizer.fit_transform(text_series)
-    counts = X.toarray().sum(axis=0)
-    ngrams_freq = dict(zip(vectorizer.get_feature_names_out(), counts))
-    top_ngrams = sorted(ngrams_freq.items(), key=lambda x: x[1], reverse=True)[:n]
-    return top_ngrams
+    return top_ngrams_by_label(text_series, ['all'] * len(text_series), ngram_range, n).get('all', [])
 
 # Membuat bar chart horizontal untuk top n-grams
 def plot_top_ngrams_bar_chart(top_ngrams, title):
@@ -41,16 +31,3 @@ def plot_top_ngrams_bar_chart(top_ngrams, title):
         ax.set_ylabel('N-gram')
         st.pyplot(fig)
 
-# Membuat dan menyimpan summary chart (bar chart jumlah positif & negatif)
-def save_summary_chart(df, filename):
-    count_positive = (df['Sentiment'] == 'positive').sum()
-    count_negative = (df['Sentiment'] == 'negative').sum()
-    summary_df = pd.DataFrame({
-        'Sentiment': ['Positive', 'Negative'],
-        'Count': [count_positive, count_negative]
-    })
-    fig, ax = plt.subplots()
-    ax.bar(summary_df['Sentiment'], summary_df['Count'], color=['green', 'red'])
-    ax.set_title("Sentiment Summary")
-    fig.savefig(filename)
-    plt.close(fig)
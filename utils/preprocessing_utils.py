@@ -1,9 +1,5 @@
 # --- Load stopwords 
 import nltk
-nltk.download('stopwords')
-nltk.download('punkt_tab')
-nltk.download('averaged_perceptron_tagger_eng')
-nltk.download('wordnet')
 import pandas as pd
 import re
 import string
@@ -12,7 +8,41 @@ from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from nltk.corpus import wordnet
+import hashlib
 import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from math import log
+from utils.matcher_utils import PhraseMatcher
+from utils.metrics_utils import metrics_enabled, register_cache, timed
+
+# --- Cek resource NLTK secara offline, download hanya yang belum ada ---
+NLTK_RESOURCES = {
+    'stopwords': 'corpora/stopwords',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'averaged_perceptron_tagger_eng': 'taggers/averaged_perceptron_tagger_eng',
+    'wordnet': 'corpora/wordnet',
+}
+
+def missing_nltk_resources():
+    missing = []
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(name)
+    return missing
+
+def ensure_nltk_data(download_missing=True):
+    missing = missing_nltk_resources()
+    if download_missing:
+        for name in missing:
+            nltk.download(name, quiet=True)
+        missing = missing_nltk_resources()
+    return missing
+
+ensure_nltk_data(download_missing=os.environ.get('LADS_NLTK_OFFLINE') != '1')
 
 
 stop_words_en = set(stopwords.words('english'))
@@ -26,11 +56,15 @@ custom_stopwords = {
 }
 stop_words_en.update(custom_stopwords)
 
+# Stopword satu kata & frasa ('you re', 'loo b tupi') dalam satu trie
+STOPWORD_MATCHER = PhraseMatcher({word: None for word in stop_words_en})
+
 # --- Load slang dictionary ---
+SLANG_PATH = os.path.join(os.path.dirname(__file__), "slang.txt")
+
 def load_slang_dict():
     slang_dict = {}
-    slang_path = os.path.join(os.path.dirname(__file__), "slang.txt")
-    with open(slang_path, "r", encoding="utf-8") as file:
+    with open(SLANG_PATH, "r", encoding="utf-8") as file:
         for line in file:
             line = line.strip()
             if line:
@@ -39,13 +73,34 @@ def load_slang_dict():
                     slang_dict[parts[0].strip()] = parts[1].strip()
     return slang_dict
 
+# Matcher slang (mendukung entri multi kata seperti 'on fleek'), dibangun ulang hanya jika dict-nya berganti
+_slang_matcher_cache = {'slang_dict': None, 'size': 0, 'matcher': None}
+_slang_matcher_lock = threading.Lock()
+
+def get_slang_matcher(slang_dict):
+    with _slang_matcher_lock:
+        cache = _slang_matcher_cache
+        if cache['slang_dict'] is not slang_dict or cache['size'] != len(slang_dict):
+            cache['matcher'] = PhraseMatcher(slang_dict)
+            cache['slang_dict'] = slang_dict
+            cache['size'] = len(slang_dict)
+        return cache['matcher']
+
+# --- Compiled patterns (dibuat sekali saat import) ---
+# Emoji teks + tanda baca + karakter non-ASCII dihapus dalam satu regex (satu kali scan per review).
+# Emoji dicoba lebih dulu di tiap posisi, jadi hasilnya sama dengan menghapus emoji lalu tanda baca.
+EMOTICONS = ['<3', ':)', ':-)', ':(', ':-(', ':D', 'XD', 'xD']
+CLEAN_RE = re.compile(
+    '(?i:' + '|'.join(re.escape(emoticon) for emoticon in EMOTICONS) + ')'
+    + r'|[^\w\s]|[^\x00-\x7F]+'
+)
+ELONGATED_RE = re.compile(r'(.)\1{2,}')
+STRIP_WORD_TABLE = str.maketrans('', '', string.punctuation + string.digits)
+
 # --- Clean emojis & special chars ---
 def clean_data_ulasan(text):
-    text = re.sub(r'(<3|:\)|:-\)|:\(|:-\(|:D|XD|xD)', '', text, flags=re.IGNORECASE)  # hapus emoji teks
-    text = re.sub(r'[^\w\s]', '', text)        # hapus tanda baca
-    text = re.sub(r'[^\x00-\x7F]+', '', text)  # hapus karakter non-ASCII
-    text = re.sub(r'\s+', ' ', text).strip()   # rapikan spasi
-    return text
+    text = CLEAN_RE.sub('', text)  # hapus emoji teks, tanda baca & karakter non-ASCII
+    return ' '.join(text.split())  # rapikan spasi
 
 # --- Case folding ---
 def case_folding(text):
@@ -53,38 +108,123 @@ def case_folding(text):
 
 # --- Remove slang ---
 def remove_slang(text, slang_dict):
-    words = text.split()
-    normalized_words = [slang_dict.get(word, word) for word in words]
-    return ' '.join(normalized_words)
+    return ' '.join(get_slang_matcher(slang_dict).replace(text.split()))
 
 # --- Normalisasi (huruf berulang & split) ---
-keywords_with_numbers = {'f2p', 'p2w', '5star', '4star', '10pull', '10x', '2d', '3d'}
+DEFAULT_KEYWORDS_WITH_NUMBERS = frozenset({'f2p', 'p2w', '5star', '4star', '10pull', '10x', '2d', '3d'})
+keywords_with_numbers = set(DEFAULT_KEYWORDS_WITH_NUMBERS)
 
 def reduce_elongated_words(word):
-    return re.sub(r'(.)\1{2,}', r'\1\1', word)
+    return ELONGATED_RE.sub(r'\1\1', word)
+
+def strip_word(word):
+    if word.isascii():
+        return word.translate(STRIP_WORD_TABLE)
+    return ''.join(char for char in word if char not in string.punctuation and not char.isdigit())
+
+# --- Segmentasi kata (wordninja) dengan jalur cepat ---
+# 1. Kata umum yang memang tidak dipecah wordninja -> lookup set (dibangun sekali, saat pertama dipakai)
+# 2. Kata lain -> hasil split di-memo dalam LRU cache
+SEGMENT_CACHE_SIZE = int(os.environ.get('LADS_SEGMENT_CACHE_SIZE', 100000))
+KNOWN_WORDS_SIZE = int(os.environ.get('LADS_KNOWN_WORDS_SIZE', 20000))
+
+_segmentation = {'model': wordninja.DEFAULT_LANGUAGE_MODEL, 'known_words': None, 'known_hits': 0, 'version': 'default'}
+_segmentation_lock = threading.Lock()
+
+def _model_words(model):
+    return sorted(model._wordcost, key=model._wordcost.get)
+
+# Model frekuensi kata khusus domain: domain_words (paling sering dulu) ditaruh di atas kosakata bawaan
+class DomainLanguageModel(wordninja.LanguageModel):
+    def __init__(self, domain_words, base_model=wordninja.DEFAULT_LANGUAGE_MODEL):
+        domain_words = [word.lower() for word in domain_words]
+        words = list(dict.fromkeys(domain_words + _model_words(base_model)))
+        self._wordcost = dict((k, log((i + 1) * log(len(words)))) for i, k in enumerate(words))
+        self._maxword = max(len(x) for x in words)
+
+def _split_uncached(word):
+    return tuple(_segmentation['model'].split(word))
+
+_split_cached = lru_cache(maxsize=SEGMENT_CACHE_SIZE)(_split_uncached)
+
+def _known_words():
+    known_words = _segmentation['known_words']
+    if known_words is None:
+        with _segmentation_lock:
+            if _segmentation['known_words'] is None:
+                model = _segmentation['model']
+                top_words = _model_words(model)[:KNOWN_WORDS_SIZE]
+                _segmentation['known_words'] = frozenset(word for word in top_words if model.split(word) == [word])
+            known_words = _segmentation['known_words']
+    return known_words
+
+def segment_word(word):
+    if word in _known_words():
+        with _segmentation_lock:
+            _segmentation['known_hits'] += 1
+        return (word,)
+    return _split_cached(word)
+
+# Model & domain_keywords menggantikan yang sebelumnya; tanpa argumen kembali ke model & keyword bawaan
+def set_segmentation_model(model=None, domain_keywords=()):
+    global _split_cached
+    model = model or wordninja.DEFAULT_LANGUAGE_MODEL
+    # Istilah game yang mengandung angka (f2p, 10pull, ...) tidak dibersihkan/dipecah sama sekali
+    keywords = DEFAULT_KEYWORDS_WITH_NUMBERS | {word.lower() for word in domain_keywords}
+    if model is wordninja.DEFAULT_LANGUAGE_MODEL and keywords == DEFAULT_KEYWORDS_WITH_NUMBERS:
+        version = 'default'
+    else:
+        digest = hashlib.sha256('\n'.join(_model_words(model)).encode())
+        digest.update('\n'.join(sorted(keywords)).encode())
+        version = digest.hexdigest()
+    with _segmentation_lock:
+        _segmentation['model'] = model
+        _segmentation['known_words'] = None
+        _segmentation['version'] = version
+        _split_cached = lru_cache(maxsize=_split_cached.cache_info().maxsize)(_split_uncached)
+        keywords_with_numbers.clear()
+        keywords_with_numbers.update(keywords)
+
+# Fingerprint model segmentasi + keyword, bagian dari preprocessing_version()
+def segmentation_version():
+    return _segmentation['version']
+
+# Naikkan jika hasil preprocessing berubah (regex, stopword, urutan tahap, ...), supaya hasil lama di result cache,
+# text store & cache preprocessing training tidak dipakai lagi
+PREPROCESS_VERSION = 1
+
+def preprocessing_version():
+    return f"{PREPROCESS_VERSION}:{segmentation_version()}"
+
+def set_segment_cache_size(size):
+    global _split_cached
+    _split_cached = lru_cache(maxsize=max(0, int(size)))(_split_uncached)
+
+def segment_cache_info():
+    info = _split_cached.cache_info()
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+        'known_hits': _segmentation['known_hits'],
+        'known_words': len(_segmentation['known_words'] or ()),
+    }
+
+register_cache('segment', segment_cache_info)
+
+def normalize_word(word):
+    if word in keywords_with_numbers:
+        return [word]
+    return segment_word(reduce_elongated_words(strip_word(word)))
 
 def prep_text(text):
     if pd.isnull(text):
         return ""
 
-    raw_words = text.split()
-    cleaned_words = []
-
-    for word in raw_words:
-        if word in keywords_with_numbers:
-            cleaned_words.append(word)
-        else:
-            word_clean = ''.join(char for char in word if char not in string.punctuation and not char.isdigit())
-            word_clean = reduce_elongated_words(word_clean)
-            cleaned_words.append(word_clean)
-
     final_words = []
-    for word in cleaned_words:
-        if word in keywords_with_numbers:
-            final_words.append(word)
-        else:
-            split_words = wordninja.split(word)
-            final_words.extend(split_words)
+    for word in text.split():
+        final_words.extend(normalize_word(word))
 
     return ' '.join(final_words).strip()
 
@@ -92,7 +232,7 @@ def prep_text(text):
 def remove_stopwords(text):
     if pd.isnull(text):
         return ""
-    return ' '.join([word for word in text.split() if word not in stop_words_en])
+    return ' '.join(STOPWORD_MATCHER.replace(text.split()))
 
 # --- Tokenisasi ---
 def tokenize_text(text):
@@ -101,23 +241,195 @@ def tokenize_text(text):
 # --- Lemmatization ---
 lemmatizer = WordNetLemmatizer()
 
-def get_wordnet_pos(word):
-    tag = nltk.pos_tag([word])[0][1][0].upper()
+def wordnet_pos_from_tag(tag):
     tag_dict = {"J": wordnet.ADJ, "N": wordnet.NOUN, "V": wordnet.VERB, "R": wordnet.ADV}
-    return tag_dict.get(tag, wordnet.NOUN)
+    return tag_dict.get(tag[0].upper(), wordnet.NOUN)
+
+def get_wordnet_pos(word):
+    return wordnet_pos_from_tag(nltk.pos_tag([word])[0][1])
+
+# --- Cache kata -> lemma (LRU, ukuran bisa diatur) ---
+LEMMA_CACHE_SIZE = 50000
+_lemma_cache = OrderedDict()
+_lemma_cache_lock = threading.Lock()
+_lemma_cache_stats = {'hits': 0, 'misses': 0, 'maxsize': LEMMA_CACHE_SIZE}
+
+def _lemma_cache_get(word):
+    with _lemma_cache_lock:
+        lemma = _lemma_cache.get(word)
+        if lemma is None:
+            _lemma_cache_stats['misses'] += 1
+        else:
+            _lemma_cache_stats['hits'] += 1
+            _lemma_cache.move_to_end(word)
+        return lemma
+
+def _lemma_cache_put(word, lemma):
+    with _lemma_cache_lock:
+        _lemma_cache[word] = lemma
+        _lemma_cache.move_to_end(word)
+        while len(_lemma_cache) > _lemma_cache_stats['maxsize']:
+            _lemma_cache.popitem(last=False)
+
+def set_lemma_cache_size(size):
+    with _lemma_cache_lock:
+        _lemma_cache_stats['maxsize'] = max(0, int(size))
+        while len(_lemma_cache) > _lemma_cache_stats['maxsize']:
+            _lemma_cache.popitem(last=False)
+
+def clear_lemma_cache():
+    with _lemma_cache_lock:
+        _lemma_cache.clear()
+        _lemma_cache_stats['hits'] = 0
+        _lemma_cache_stats['misses'] = 0
+
+def lemma_cache_info():
+    with _lemma_cache_lock:
+        lookups = _lemma_cache_stats['hits'] + _lemma_cache_stats['misses']
+        return {
+            'hits': _lemma_cache_stats['hits'],
+            'misses': _lemma_cache_stats['misses'],
+            'size': len(_lemma_cache),
+            'maxsize': _lemma_cache_stats['maxsize'],
+            'hit_ratio': _lemma_cache_stats['hits'] / lookups if lookups else 0.0,
+        }
+
+register_cache('lemma', lemma_cache_info)
+
+def lemmatize_word(word):
+    lemma = _lemma_cache_get(word)
+    if lemma is None:
+        lemma = lemmatizer.lemmatize(word, get_wordnet_pos(word))
+        _lemma_cache_put(word, lemma)
+    return lemma
 
 def lemmatize(tokens):
-    lemmatized_text = [lemmatizer.lemmatize(word, get_wordnet_pos(word)) for word in tokens]
-    return ' '.join(lemmatized_text)
+    return ' '.join([lemmatize_word(word) for word in tokens])
+
+# Batch: tiap token unik di-tag sekali (sebagai kalimat satu kata, sama seperti
+# get_wordnet_pos), lalu hasilnya disebar kembali ke semua dokumen
+def lemmatize_batch(token_lists):
+    unique_words = set()
+    for tokens in token_lists:
+        unique_words.update(tokens)
+
+    lemmas = {}
+    missing = []
+    for word in unique_words:
+        lemma = _lemma_cache_get(word)
+        if lemma is None:
+            missing.append(word)
+        else:
+            lemmas[word] = lemma
+
+    if missing:
+        for [(word, tag)] in nltk.pos_tag_sents([[word] for word in missing]):
+            lemma = lemmatizer.lemmatize(word, wordnet_pos_from_tag(tag))
+            lemmas[word] = lemma
+            _lemma_cache_put(word, lemma)
+
+    return [' '.join([lemmas[word] for word in tokens]) for tokens in token_lists]
+
+# --- Normalizer satu kali jalan (semua tahap per dokumen) ---
+INTERMEDIATE_COLUMNS = ['clean_content', 'case_folding', 'slang_removed', 'normalized', 'stopword', 'tokenized']
+# Tahap setelah case folding: hasilnya hanya bergantung pada teks yang sudah di-fold,
+# jadi teks dengan hasil case folding yang sama cukup diproses sekali (dedup di pipeline_utils)
+FOLDED_COLUMNS = INTERMEDIATE_COLUMNS[2:]
+
+def normalize_text_tokens(text, slang_dict):
+    clean = clean_data_ulasan(text)
+    folded = clean.lower()
+    return (clean, folded) + normalize_folded_tokens(folded, slang_dict)
+
+def normalize_folded_tokens(folded, slang_dict):
+    # Antar tahap tetap berupa list kata, tanpa join lalu split ulang
+    slang_words = get_slang_matcher(slang_dict).replace(folded.split())
+    slang_removed = ' '.join(slang_words)
+
+    normalized_words = []
+    for word in slang_removed.split():
+        normalized_words.extend(normalize_word(word))
+    normalized = ' '.join(normalized_words).strip()
+
+    stopword = ' '.join(STOPWORD_MATCHER.replace([word for word in normalized_words if word]))
+    tokens = word_tokenize(stopword)
+    return slang_removed, normalized, stopword, tokens
 
 # --- Pipeline lengkap untuk DataFrame ---
-def preprocess_dataframe(df, slang_dict):
+# Tahap 1 (per baris, murah): clean_content & case_folding
+def clean_and_fold(texts):
+    if metrics_enabled():
+        with timed("preprocess.clean_content", rows=len(texts)):
+            clean = [clean_data_ulasan(text) for text in texts]
+        with timed("preprocess.case_folding", rows=len(texts)):
+            return clean, [case_folding(text) for text in clean]
+    clean = [clean_data_ulasan(text) for text in texts]
+    return clean, [text.lower() for text in clean]
+
+# Tahap 2 (mahal): slang, normalisasi, stopword, tokenisasi & lemmatisasi dari teks yang sudah di-fold
+# Hasil: {kolom: list nilai}, kolom FOLDED_COLUMNS hanya jika keep_intermediate
+def preprocess_folded(folded_texts, slang_dict, keep_intermediate=True, batch_lemmatize=True):
+    if metrics_enabled():
+        return _preprocess_folded_timed(folded_texts, slang_dict, keep_intermediate, batch_lemmatize)
+    columns = {}
+    if keep_intermediate:
+        stages = [normalize_folded_tokens(text, slang_dict) for text in folded_texts]
+        for i, column in enumerate(FOLDED_COLUMNS):
+            columns[column] = [row[i] for row in stages]
+        token_lists = columns['tokenized']
+    else:
+        token_lists = [normalize_folded_tokens(text, slang_dict)[-1] for text in folded_texts]
+
+    if batch_lemmatize:
+        columns['preprocess'] = lemmatize_batch(token_lists)
+    else:
+        columns['preprocess'] = [lemmatize(tokens) for tokens in token_lists]
+    return columns
+
+# Kolom tahap dihitung ulang dari content saat dibutuhkan (hasil compact tidak menyimpannya).
+# Teks dengan hasil case folding yang sama hanya dinormalisasi sekali; lemmatisasi tidak diperlukan.
+def intermediate_columns(texts, slang_dict):
+    clean, folded = clean_and_fold(list(texts))
+    codes, unique_texts = pd.factorize(pd.Series(folded, dtype=object))
+    stages = [normalize_folded_tokens(text, slang_dict) for text in unique_texts]
+    columns = {'clean_content': clean, 'case_folding': folded}
+    for i, column in enumerate(FOLDED_COLUMNS):
+        columns[column] = [stages[code][i] for code in codes]
+    return columns
+
+def preprocess_dataframe(df, slang_dict, keep_intermediate=True, batch_lemmatize=True):
     df = df.copy()
-    df['clean_content'] = df['content'].apply(clean_data_ulasan)
-    df['case_folding'] = df['clean_content'].apply(case_folding)
-    df['slang_removed'] = df['case_folding'].apply(lambda x: remove_slang(x, slang_dict))
-    df['normalized'] = df['slang_removed'].apply(prep_text)
-    df['stopword'] = df['normalized'].apply(remove_stopwords)
-    df['tokenized'] = df['stopword'].apply(tokenize_text)
-    df['preprocess'] = df['tokenized'].apply(lemmatize)
-    return df
\ No newline at end of file
+    clean, folded = clean_and_fold(df['content'].tolist())
+    if keep_intermediate:
+        df['clean_content'] = clean
+        df['case_folding'] = folded
+    for column, values in preprocess_folded(folded, slang_dict, keep_intermediate, batch_lemmatize).items():
+        df[column] = values
+    return df
+
+# --- Tahapan preprocessing: (kolom hasil, kolom input, fungsi per teks) ---
+# Dipakai pipeline bertahap di bawah & benchmark.py (waktu per tahap)
+def preprocess_stages(slang_dict):
+    return [
+        ('clean_content', 'content', clean_data_ulasan),
+        ('case_folding', 'clean_content', case_folding),
+        ('slang_removed', 'case_folding', lambda x: remove_slang(x, slang_dict)),
+        ('normalized', 'slang_removed', prep_text),
+        ('stopword', 'normalized', remove_stopwords),
+        ('tokenized', 'stopword', tokenize_text),
+        ('preprocess', 'tokenized', lemmatize),
+    ]
+
+# Versi dengan timer per tahap (LADS_METRICS=1): tahap dijalankan terpisah, hasil sama dengan jalur satu kali jalan
+def _preprocess_folded_timed(folded_texts, slang_dict, keep_intermediate, batch_lemmatize):
+    columns = {}
+    rows = len(folded_texts)
+    values = folded_texts
+    for column, _, func in preprocess_stages(slang_dict)[2:-1]:
+        with timed(f"preprocess.{column}", rows=rows):
+            values = [func(value) for value in values]
+        if keep_intermediate:
+            columns[column] = values
+    with timed("preprocess.lemmatize", rows=rows):
+        columns['preprocess'] = lemmatize_batch(values) if batch_lemmatize else [lemmatize(tokens) for tokens in values]
+    return columns
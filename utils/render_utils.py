@@ -0,0 +1,60 @@
+import io
+from collections import Counter
+from matplotlib.figure import Figure
+from wordcloud import WordCloud
+from utils.metrics_utils import timed
+
+# Render gambar ke PNG (bytes) tanpa pyplot & tanpa Streamlit:
+# aman dipanggil dari thread/process worker dan dari skrip non-UI
+
+def figure_to_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+# --- Wordcloud ---
+# Ukuran penuh untuk PDF, preview kecil untuk tab Wordcloud (render ~4x lebih cepat)
+WORDCLOUD_SIZE = (800, 400)
+WORDCLOUD_PREVIEW_SIZE = (400, 200)
+
+def wordcloud_image_name(label, size=WORDCLOUD_SIZE):
+    return f"wordcloud_{label}_{size[0]}x{size[1]}"
+
+def _make_wordcloud(width, height):
+    return WordCloud(width=width, height=height, background_color='white', colormap='magma')
+
+# Frekuensi token dari kolom preprocess (sudah bersih, tanpa stopword & sudah dilematisasi):
+# tanpa tokenisasi ulang WordCloud, cukup split + Counter di C. Hasil per chunk bisa dijumlahkan.
+def token_frequencies(preprocessed_texts):
+    with timed("word_frequencies", rows=len(preprocessed_texts)):
+        return Counter(" ".join(preprocessed_texts).split())
+
+# None jika tidak ada token (mis. semua teks kosong setelah preprocessing)
+def render_wordcloud_frequencies_png(frequencies, width=WORDCLOUD_SIZE[0], height=WORDCLOUD_SIZE[1]):
+    if not frequencies:
+        return None
+    with timed("wordcloud"):
+        wordcloud = _make_wordcloud(width, height).generate_from_frequencies(frequencies)
+        buffer = io.BytesIO()
+        wordcloud.to_image().save(buffer, format='png')
+        return buffer.getvalue()
+
+# --- Bar chart jumlah positif & negatif ---
+def render_summary_chart_png(count_positive, count_negative):
+    fig = Figure()
+    ax = fig.subplots()
+    ax.bar(['Positive', 'Negative'], [count_positive, count_negative], color=['green', 'red'])
+    ax.set_title("Sentiment Summary")
+    return figure_to_png(fig)
+
+# --- Bar chart horizontal top n-gram ---
+def render_top_ngrams_chart_png(top_ngrams, title, figsize=(8, 4)):
+    ngrams, counts = zip(*top_ngrams)
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    ax.barh(ngrams, counts, color='#7F55B1')
+    ax.invert_yaxis()  # agar n-gram frekuensi tertinggi di atas
+    ax.set_title(title)
+    ax.set_xlabel("Frequency")
+    fig.tight_layout()
+    return figure_to_png(fig)
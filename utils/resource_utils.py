@@ -0,0 +1,43 @@
+import os
+import threading
+import time
+
+from utils.model_utils import MODEL_PATH, load_model
+from utils.preprocessing_utils import SLANG_PATH, load_slang_dict, missing_nltk_resources
+
+# --- Registry resource: dimuat sekali per proses server, dipakai bersama semua session & rerun ---
+MODEL_MMAP_MODE = os.environ.get('LADS_MODEL_MMAP', 'r') or None
+
+_resources = {}
+_resource_versions = {}
+_resources_lock = threading.Lock()
+_load_times = {}
+
+# version: jika berubah (mis. mtime file), resource dimuat ulang
+def _get_or_load(name, loader, version=None):
+    if name in _resources and _resource_versions.get(name) == version:
+        return _resources[name]
+    with _resources_lock:
+        if name not in _resources or _resource_versions.get(name) != version:
+            start = time.perf_counter()
+            _resources[name] = loader()
+            _resource_versions[name] = version
+            _load_times[name] = time.perf_counter() - start
+        return _resources[name]
+
+# Model hasil retraining yang menimpa MODEL_PATH ikut dimuat ulang (versi = mtime file)
+def get_model():
+    return _get_or_load('model', lambda: load_model(mmap_mode=MODEL_MMAP_MODE), version=os.stat(MODEL_PATH).st_mtime_ns)
+
+# Hot reload: slang.txt yang diubah langsung terbaca tanpa restart server
+def get_slang_dict():
+    return _get_or_load('slang_dict', load_slang_dict, version=os.stat(SLANG_PATH).st_mtime_ns)
+
+def get_missing_nltk_resources():
+    return _get_or_load('nltk_missing', missing_nltk_resources)
+
+# Waktu load tiap resource (detik) + total cold start
+def resource_load_stats():
+    stats = dict(_load_times)
+    stats['cold_start'] = sum(_load_times.values())
+    return stats
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from utils.model_utils import SENTIMENT_DTYPE, SENTIMENT_LABELS
+
+# Jumlah kata per teks, sama dengan len(text.split())
+def word_counts(texts):
+    return texts.astype(str).str.split().str.len().fillna(0).to_numpy(dtype=np.int32)
+
+# Hasil analisis sudah membawa kolom TextLength (dihitung sekali di pipeline)
+def text_lengths(df):
+    if 'TextLength' in df.columns:
+        return df['TextLength'].to_numpy(dtype=np.int64)
+    return word_counts(df['content']).astype(np.int64)
+
+# --- Statistik sentimen: dihitung sekali per chunk lalu diakumulasi ---
+# Summary, Download, PDF & progress streaming semuanya membaca dari objek ini.
+# Batch baru cukup di-update(), data lama tidak dihitung ulang.
+class SentimentStats:
+    def __init__(self, n_examples=3):
+        self.n_examples = n_examples
+        self.counts = {label: 0 for label in SENTIMENT_LABELS}
+        self.length_sum = {label: 0 for label in SENTIMENT_LABELS}
+        # length_hist[label][k] = jumlah teks dengan k kata
+        self.length_hist = {label: np.zeros(0, dtype=np.int64) for label in SENTIMENT_LABELS}
+        self.examples = {label: [] for label in SENTIMENT_LABELS}
+        self.low_confidence = 0
+
+    @classmethod
+    def from_dataframe(cls, df, n_examples=3):
+        return cls(n_examples).update(df)
+
+    def update(self, df):
+        if len(df) == 0:
+            return self
+        codes = pd.Categorical(df['Sentiment'], dtype=SENTIMENT_DTYPE).codes
+        lengths = text_lengths(df)
+        valid = codes >= 0
+        codes, lengths = codes[valid], lengths[valid]
+
+        n_labels = len(SENTIMENT_LABELS)
+        counts = np.bincount(codes, minlength=n_labels)
+        length_sums = np.bincount(codes, weights=lengths, minlength=n_labels)
+        content = df['content'].iloc[np.flatnonzero(valid)]
+        for code, label in enumerate(SENTIMENT_LABELS):
+            if not counts[code]:
+                continue
+            rows = np.flatnonzero(codes == code)
+            self.counts[label] += int(counts[code])
+            self.length_sum[label] += int(length_sums[code])
+            self.length_hist[label] = _add_hist(self.length_hist[label], np.bincount(lengths[rows]))
+            missing = self.n_examples - len(self.examples[label])
+            if missing > 0:
+                self.examples[label].extend(content.iloc[rows[:missing]].astype(str).tolist())
+
+        if 'LowConfidence' in df.columns:
+            self.low_confidence += int(df['LowConfidence'].to_numpy(dtype=bool)[valid].sum())
+        return self
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def count(self, label):
+        return self.counts[label]
+
+    def percent(self, label):
+        total = self.total
+        return round(100 * self.counts[label] / total, 1) if total > 0 else 0
+
+    def average_length(self, label):
+        count = self.counts[label]
+        return self.length_sum[label] / count if count else float('nan')
+
+    def length_quantile(self, label, q):
+        hist = self.length_hist[label]
+        if not hist.sum():
+            return float('nan')
+        cumulative = np.cumsum(hist)
+        return int(np.searchsorted(cumulative, q * cumulative[-1]))
+
+    # 'positive' / 'negative' / None jika jumlahnya sama
+    def dominant(self):
+        if self.counts['positive'] == self.counts['negative']:
+            return None
+        return max(SENTIMENT_LABELS, key=self.counts.get)
+
+    # Bentuk JSON-friendly untuk disimpan (summary.json dari cli.py)
+    def to_dict(self):
+        return {
+            'n_examples': self.n_examples,
+            'counts': dict(self.counts),
+            'length_sum': dict(self.length_sum),
+            'length_hist': {label: hist.tolist() for label, hist in self.length_hist.items()},
+            'examples': {label: list(texts) for label, texts in self.examples.items()},
+            'low_confidence': self.low_confidence,
+        }
+
+def _add_hist(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    result = a.astype(np.int64, copy=True)
+    result[:len(b)] += b
+    return result
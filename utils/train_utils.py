@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections import Counter
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.metrics import accuracy_score, confusion_matrix, precision_recall_fscore_support
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from utils.cache_utils import USER_CACHE_DIR, file_fingerprint
+from utils.io_utils import CONTENT_COLUMN, iter_content_chunks
+from utils.model_utils import MODEL_PATH, SENTIMENT_LABELS, load_model
+from utils.preprocessing_utils import SLANG_PATH, load_slang_dict, preprocess_dataframe, preprocessing_version
+
+LABEL_COLUMN = 'label'
+MODEL_DIR = os.environ.get('LADS_MODEL_DIR', 'models')
+PREPROCESS_CACHE_DIR = os.environ.get('LADS_PREPROCESS_CACHE_DIR', os.path.join(USER_CACHE_DIR, 'preprocess'))
+
+# Parameter vectorizer bawaan, sama dengan mnb_model.pkl
+NGRAM_RANGE = (1, 2)
+# Varian hashing: 2^15 bucket untuk vocabulary ~15rb term (mnb_model.pkl). Dengan --compact artifact ~640 KB
+# (idf + 2 baris bobot per bucket), lebih kecil dari mnb_model.pkl (~820 KB); 2^16 justru ~1.3 MB
+HASHING_FEATURES = 2 ** 15
+
+POSITIVE_VALUES = {'positive', 'pos', '1', 'true'}
+NEGATIVE_VALUES = {'negative', 'neg', '0', 'false'}
+
+# --- Label: 1 = positive, 0 = negative, -1 = tidak dikenal (baris dibuang) ---
+# score_threshold: label dari rating (mis. score Play Store >= 4 -> positive)
+def encode_labels(values, score_threshold=None):
+    values = pd.Series(values).astype(str).str.strip().str.lower()
+    if score_threshold is not None:
+        scores = pd.to_numeric(values, errors='coerce').to_numpy()
+        return np.where(np.isnan(scores), -1, scores >= score_threshold).astype(np.int8)
+    labels = np.full(len(values), -1, dtype=np.int8)
+    labels[values.isin(POSITIVE_VALUES).to_numpy()] = 1
+    labels[values.isin(NEGATIVE_VALUES).to_numpy()] = 0
+    return labels
+
+# --- Preprocessing per chunk dengan cache Parquet (key = isi chunk + versi slang.txt & preprocessing) ---
+# Pass kedua & training ulang dengan parameter lain tidak memproses teks lagi
+def preprocess_cached(texts, slang_dict, cache_dir=PREPROCESS_CACHE_DIR):
+    path = None
+    if cache_dir:
+        key = hashlib.sha256(file_fingerprint(SLANG_PATH).encode())
+        # Kode preprocessing / model segmentasi berubah -> hasil lama tidak dipakai
+        key.update(preprocessing_version().encode())
+        for text in texts:
+            key.update(text.encode('utf-8', 'surrogatepass'))
+            key.update(b'\0')
+        path = os.path.join(cache_dir, f"{key.hexdigest()}.parquet")
+        if os.path.exists(path):
+            return pd.read_parquet(path)['preprocess'].tolist()
+
+    df = preprocess_dataframe(pd.DataFrame({CONTENT_COLUMN: texts}), slang_dict, keep_intermediate=False)
+    preprocessed = df['preprocess'].astype(str).tolist()
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pd.DataFrame({'preprocess': preprocessed}).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    return preprocessed
+
+# --- Chunk training: (teks hasil preprocess, label, mask holdout) ---
+# Split holdout deterministik per chunk (seed, nomor chunk), jadi sama di setiap pass
+def iter_training_chunks(path, slang_dict, label_column=LABEL_COLUMN, chunk_size=20000, test_size=0.2, seed=42,
+                         score_threshold=None, cache_dir=PREPROCESS_CACHE_DIR):
+    with open(path, 'rb') as f:
+        chunks = iter_content_chunks(f, path, chunk_size, extra_columns=[label_column], text_columns=[label_column])
+        for chunk_no, chunk in enumerate(chunks):
+            labels = encode_labels(chunk[label_column], score_threshold)
+            keep = labels >= 0
+            texts = chunk[CONTENT_COLUMN].to_numpy()[keep].tolist()
+            labels = labels[keep]
+            holdout = np.random.default_rng([seed, chunk_no]).random(len(labels)) < test_size
+            yield preprocess_cached(texts, slang_dict, cache_dir), labels, holdout
+
+def _select(texts, mask):
+    return [text for text, selected in zip(texts, mask) if selected]
+
+# --- Pass 1: vocabulary & document frequency (out-of-core) ---
+# Hasilnya sama dengan TfidfVectorizer.fit pada seluruh data training sekaligus.
+# min_df / max_features memangkas vocabulary berdasarkan document frequency.
+def fit_tfidf_vectorizer(text_chunks, ngram_range=NGRAM_RANGE, min_df=1, max_features=None, dtype=np.float64):
+    vectorizer = TfidfVectorizer(ngram_range=ngram_range, dtype=dtype)
+    analyze = vectorizer.build_analyzer()
+    doc_freq = Counter()
+    n_docs = 0
+    for texts in text_chunks:
+        for text in texts:
+            doc_freq.update(set(analyze(text)))
+        n_docs += len(texts)
+
+    terms = [term for term, count in doc_freq.items() if count >= min_df]
+    if max_features is not None and len(terms) > max_features:
+        terms = sorted(terms, key=lambda term: (-doc_freq[term], term))[:max_features]
+    if not terms:
+        raise ValueError("Empty vocabulary; the training data has no usable text")
+    terms.sort()
+
+    vectorizer.vocabulary_ = {term: i for i, term in enumerate(terms)}
+    counts = np.array([doc_freq[term] for term in terms], dtype=np.float64)
+    # smooth_idf=True: idf = ln((1 + n) / (1 + df)) + 1
+    vectorizer.idf_ = (np.log((1 + n_docs) / (1 + counts)) + 1).astype(dtype)
+    return vectorizer
+
+# Varian hashing: tanpa vocabulary di memori/artifact, idf tetap dihitung dari pass 1
+def fit_hashing_vectorizer(text_chunks, ngram_range=NGRAM_RANGE, n_features=HASHING_FEATURES, dtype=np.float64):
+    hashing = HashingVectorizer(ngram_range=ngram_range, n_features=n_features, alternate_sign=False,
+                                norm=None, dtype=dtype)
+    doc_freq = np.zeros(n_features, dtype=np.int64)
+    n_docs = 0
+    for texts in text_chunks:
+        X = hashing.transform(texts)
+        doc_freq += np.bincount(X.indices, minlength=n_features)
+        n_docs += len(texts)
+
+    tfidf = TfidfTransformer()
+    tfidf.idf_ = (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(dtype)
+    return Pipeline([('hashing', hashing), ('tfidf', tfidf)])
+
+# --- Pass 2: MultinomialNB.partial_fit per chunk + evaluasi holdout ---
+def fit_model(vectorizer, chunks, alpha=1.0):
+    model = MultinomialNB(alpha=alpha)
+    y_true, y_pred = [], []
+    n_train = 0
+    for texts, labels, holdout in chunks:
+        train = ~holdout
+        if train.any():
+            model.partial_fit(vectorizer.transform(_select(texts, train)), labels[train], classes=[0, 1])
+            n_train += int(train.sum())
+        if holdout.any():
+            # Matriks holdout (sparse) disimpan, diprediksi setelah semua chunk training masuk
+            y_true.append(labels[holdout])
+            y_pred.append(vectorizer.transform(_select(texts, holdout)))
+    if not n_train:
+        raise ValueError("No labeled training rows found")
+
+    # Prediksi holdout setelah model selesai dilatih
+    y_pred = [model.predict(X) for X in y_pred]
+    return model, n_train, evaluate(np.concatenate(y_true) if y_true else np.array([]),
+                                    np.concatenate(y_pred) if y_pred else np.array([]))
+
+def evaluate(y_true, y_pred):
+    if not len(y_true):
+        return {}
+    precision, recall, f1, support = precision_recall_fscore_support(y_true, y_pred, labels=[0, 1], zero_division=0)
+    return {
+        'n_holdout': int(len(y_true)),
+        'accuracy': float(accuracy_score(y_true, y_pred)),
+        'per_class': {
+            label: {'precision': float(precision[i]), 'recall': float(recall[i]),
+                    'f1': float(f1[i]), 'support': int(support[i])}
+            for i, label in enumerate(SENTIMENT_LABELS)
+        },
+        'confusion_matrix': confusion_matrix(y_true, y_pred, labels=[0, 1]).tolist(),
+    }
+
+# Compact: bobot model float32 (vectorizer sudah float32 lewat dtype)
+def compact_model(model):
+    model.feature_log_prob_ = model.feature_log_prob_.astype(np.float32)
+    model.feature_count_ = model.feature_count_.astype(np.float32)
+    return model
+
+# --- Artifact berversi: bundle {'model', 'vectorizer', 'metadata'} + metadata .json di sampingnya ---
+def save_artifact(model, vectorizer, metadata, model_dir=MODEL_DIR):
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, f"mnb_model-{metadata['version']}.pkl")
+    joblib.dump({'model': model, 'vectorizer': vectorizer, 'metadata': metadata}, path)
+    # Ukuran file & waktu load artifact hanya dicatat di .json (bundle tidak bisa memuat ukurannya sendiri)
+    metadata['artifact_bytes'] = os.path.getsize(path)
+    start = time.perf_counter()
+    load_model(path)
+    metadata['load_seconds'] = round(time.perf_counter() - start, 4)
+    with open(f"{path[:-4]}.json", 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    return path
+
+# Salin artifact ke MODEL_PATH (atomik), dipakai app & server pada request berikutnya
+def install_artifact(path, target=MODEL_PATH):
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    shutil.copyfile(path, tmp_path)
+    os.replace(tmp_path, target)
+
+def train(path, label_column=LABEL_COLUMN, vectorizer_kind='tfidf', compact=False, min_df=1, max_features=None,
+          n_features=HASHING_FEATURES, alpha=1.0, test_size=0.2, seed=42, chunk_size=20000, score_threshold=None,
+          slang_dict=None, cache_dir=PREPROCESS_CACHE_DIR, model_dir=MODEL_DIR):
+    slang_dict = slang_dict if slang_dict is not None else load_slang_dict()
+    dtype = np.float32 if compact else np.float64
+    start = time.perf_counter()
+
+    def chunks():
+        return iter_training_chunks(path, slang_dict, label_column, chunk_size, test_size, seed,
+                                    score_threshold, cache_dir)
+
+    train_texts = (_select(texts, ~holdout) for texts, _, holdout in chunks())
+    if vectorizer_kind == 'hashing':
+        vectorizer = fit_hashing_vectorizer(train_texts, n_features=n_features, dtype=dtype)
+    else:
+        vectorizer = fit_tfidf_vectorizer(train_texts, min_df=min_df, max_features=max_features, dtype=dtype)
+
+    model, n_train, metrics = fit_model(vectorizer, chunks(), alpha=alpha)
+    if compact:
+        model = compact_model(model)
+
+    metadata = {
+        'version': datetime.now().strftime('%Y%m%d-%H%M%S'),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'sklearn_version': sklearn.__version__,
+        'vectorizer': vectorizer_kind,
+        'ngram_range': list(NGRAM_RANGE),
+        'n_features': n_features if vectorizer_kind == 'hashing' else len(vectorizer.vocabulary_),
+        'min_df': min_df,
+        'max_features': max_features,
+        'compact': compact,
+        'alpha': alpha,
+        'n_train': n_train,
+        'metrics': metrics,
+        'training_file': os.path.basename(path),
+        'training_sha256': file_fingerprint(path),
+        'slang_sha256': file_fingerprint(SLANG_PATH),
+        'train_seconds': round(time.perf_counter() - start, 2),
+    }
+    return save_artifact(model, vectorizer, metadata, model_dir), metadata